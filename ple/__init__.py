@@ -1 +1,9 @@
+import os
+
+# keep the pygame banner off stdout, which tools such as ple.benchmark use
+# for their output. Setting the variable beforehand shows it again.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
 from .ple import PLE
+from .pipeline import ObservationPipeline
+from .vector import VectorPLE, SubprocVectorPLE
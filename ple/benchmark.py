@@ -0,0 +1,254 @@
+"""
+Measures the throughput of the bundled games.
+
+Every game is run headless under fixed seeds and the results are printed as
+JSON so they can be compared across releases and machines::
+
+    python -m ple.benchmark
+    python -m ple.benchmark --games Catcher Pong --steps 2000 --output out.json
+
+"""
+import argparse
+import inspect
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from . import PLE
+
+try:
+    _clock = time.perf_counter
+except AttributeError:  # python 2
+    _clock = time.time
+
+
+def _game_names():
+    """
+    The names of the game classes exported by :mod:`ple.games`. Games whose
+    dependencies are missing, like doom, fail to import there and are left
+    out.
+    """
+    import ple.games
+
+    return sorted(name for name, value in vars(ple.games).items()
+                  if inspect.isclass(value))
+
+
+GAMES = _game_names()
+
+
+def _make_env(name, seed, frame_skip=1):
+    import ple.games
+
+    game = getattr(ple.games, name)()
+    # MonsterKong only runs at 30fps, use it for every game.
+    return PLE(game, fps=30, frame_skip=frame_skip, headless=True, rng=seed)
+
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+def _act_rate(name, seed, steps, frame_skip):
+    env = _make_env(name, seed, frame_skip=frame_skip)
+    actions = env.getActionSet()
+    choices = np.random.RandomState(seed).randint(0, len(actions), size=steps)
+
+    elapsed = 0.0
+    for i in range(steps):
+        if env.game_over():
+            env.reset_game()
+
+        start = _clock()
+        env.act(actions[choices[i]])
+        elapsed += _clock() - start
+
+    return _rate(steps, elapsed)
+
+
+def _act_observe_rate(name, seed, steps):
+    """
+    Steps per second of act() and reading the screen after it. Headless
+    games only draw when the screen is read, so this includes rendering.
+    """
+    env = _make_env(name, seed)
+    actions = env.getActionSet()
+    choices = np.random.RandomState(seed).randint(0, len(actions), size=steps)
+    frame = np.empty(tuple(env.getScreenDims()) + (3,), dtype=np.uint8)
+
+    elapsed = 0.0
+    for i in range(steps):
+        if env.game_over():
+            env.reset_game()
+
+        start = _clock()
+        env.act(actions[choices[i]])
+        env.getScreenRGB(out=frame)
+        elapsed += _clock() - start
+
+    return _rate(steps, elapsed)
+
+
+def _step_rate(name, seed, steps):
+    env = _make_env(name, seed)
+    game = env.game
+    dt = 1000.0 / env.fps
+
+    elapsed = 0.0
+    for i in range(steps):
+        if game.game_over():
+            env.reset_game()
+
+        start = _clock()
+        game.step(dt)
+        elapsed += _clock() - start
+
+    return _rate(steps, elapsed)
+
+
+def _observation_cost(name, seed, steps):
+    """
+    Seconds per call to read each kind of observation from a drawn frame,
+    not counting the drawing, see :func:`_act_observe_rate`.
+    """
+    env = _make_env(name, seed)
+    env.act(env.NOOP)
+    env.getScreenRGB()  # draw the frame so only the copy is timed.
+
+    dims = tuple(env.getScreenDims())
+    getters = {
+        "rgb": (env.getScreenRGB, np.empty(dims + (3,), dtype=np.uint8)),
+        "grayscale": (env.getScreenGrayscale, np.empty(dims, dtype=np.uint8)),
+    }
+    if env.game.getGameStateFields() is not None:
+        getters["state"] = (env.getGameStateVector, np.empty(
+            len(env.getGameStateFields()), dtype=np.float32))
+
+    costs = {}
+    for key, (getter, out) in getters.items():
+        start = _clock()
+        for i in range(steps):
+            getter(out=out)
+        costs[key] = (_clock() - start) / steps
+
+    return costs
+
+
+def _reset_latency(name, seed, resets):
+    env = _make_env(name, seed)
+
+    start = _clock()
+    for i in range(resets):
+        env.reset_game()
+
+    return (_clock() - start) / resets
+
+
+def run_game(name, seed=24, steps=1000, resets=20, frame_skip=4):
+    """
+    Benchmarks a single game.
+
+    Parameters
+    ----------
+    name: str
+        The class name of a game in :mod:`ple.games`, eg. "Catcher".
+
+    seed: int (default: 24)
+        Seeds the game and the random actions.
+
+    steps: int (default: 1000)
+        The number of steps timed for each of the rates.
+
+    resets: int (default: 20)
+        The number of resets the reset latency is averaged over.
+
+    frame_skip: int (default: 4)
+        The frame_skip used for the skipped act rate.
+
+    Returns
+    -------
+    dict
+        Rates are per second and costs and latencies are in seconds. The act
+        rates only run the game logic, as headless games draw on demand,
+        "act_observe_per_sec" also draws and reads each frame.
+
+    """
+    return {
+        "step_per_sec": _step_rate(name, seed, steps),
+        "act_per_sec": _act_rate(name, seed, steps, 1),
+        "act_frame_skip_per_sec": _act_rate(name, seed, steps, frame_skip),
+        "act_observe_per_sec": _act_observe_rate(name, seed, steps),
+        "observation_sec": _observation_cost(name, seed, steps),
+        "reset_sec": _reset_latency(name, seed, resets),
+    }
+
+
+def run(games=None, seed=24, steps=1000, resets=20, frame_skip=4):
+    """
+    Benchmarks several games, see :func:`run_game`. A game that fails is
+    reported with its error instead of stopping the run.
+
+    Returns
+    -------
+    dict
+        The results keyed by game name along with the settings and the
+        versions of the python, numpy and pygame used.
+
+    """
+    if games is None:
+        games = GAMES
+
+    results = {}
+    for name in games:
+        try:
+            results[name] = run_game(name, seed=seed, steps=steps,
+                                     resets=resets, frame_skip=frame_skip)
+        except Exception as e:
+            results[name] = {"error": "%s: %s" % (type(e).__name__, e)}
+
+    return {
+        "settings": {
+            "seed": seed,
+            "steps": steps,
+            "resets": resets,
+            "frame_skip": frame_skip,
+        },
+        "versions": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+        },
+        "games": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure the throughput of the PLE games.")
+    parser.add_argument("--games", nargs="+", default=GAMES,
+                        help="games to run, default all in ple.games")
+    parser.add_argument("--seed", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--resets", type=int, default=20)
+    parser.add_argument("--frame-skip", type=int, default=4)
+    parser.add_argument("--output", default=None,
+                        help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run(games=args.games, seed=args.seed, steps=args.steps,
+                  resets=args.resets, frame_skip=args.frame_skip)
+    text = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output is None:
+        sys.stdout.write(text + "\n")
+    else:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
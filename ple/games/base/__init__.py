@@ -1,5 +1,7 @@
+import sys
+
 from .pygamewrapper import PyGameWrapper
 try:
     from .doomwrapper import DoomWrapper
 except:
-    print("couldn't import doomish")
+    sys.stderr.write("couldn't import doomish\n")
@@ -68,6 +68,10 @@ class DoomWrapper(object):
         if draw_screen:
             self._window.show_frame(self.getScreenRGB())
 
+    def render(self):
+        # doom renders each frame as part of make_action.
+        pass
+
     def setRNG(self, rng):
         if isinstance(rng, int):
             self.rng = rng
@@ -75,8 +79,12 @@ class DoomWrapper(object):
         else:
             raise ValueError("ViZDoom needs an int passed as rng")
 
-    def getScreenRGB(self):
-        return self.state.image_buffer.copy()
+    def getScreenRGB(self, out=None):
+        if out is None:
+            return self.state.image_buffer.copy()
+
+        np.copyto(out, self.state.image_buffer)
+        return out
 
     def tick(self, fps):
         time.sleep(1.0/fps) #sleep a bit here (in seconds)
@@ -92,6 +100,12 @@ class DoomWrapper(object):
     def getGameState(self):
         return self.doom_game.get_state().game_variables
 
+    def getGameStateFields(self):
+        return None
+
+    def getGameStateVector(self, out=None):
+        return None
+
     def getScreenDims(self):
         return self.screen_dim
 
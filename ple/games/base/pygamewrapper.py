@@ -1,6 +1,8 @@
+import sys
+
 import pygame
 import numpy as np
-from pygame.constants import KEYDOWN, KEYUP, K_F15
+from pygame.constants import KEYDOWN, QUIT, K_F15
 
 
 class PyGameWrapper(object):
@@ -45,6 +47,9 @@ class PyGameWrapper(object):
         self.allowed_fps = None  # fps that the game is allowed to run at.
         self.NOOP = K_F15  # the noop key
         self.rng = None
+        self.headless = False  # draw off-screen without a display.
+        self._agent_input = False  # keys come from _setAction, not events.
+        self._action = None  # key set by the agent for the next step.
 
         self.rewards = {
             "positive": 1.0,
@@ -57,48 +62,94 @@ class PyGameWrapper(object):
     def _setup(self):
         """
         Setups up the pygame env, the display and game clock.
+
+        When headless the game draws to an off-screen surface and no
+        display or video driver is initialized.
+
+        The screen is always width x height, even for games whose
+        observations have other dimensions.
         """
-        pygame.init()
-        self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
+        if self.headless:
+            self.screen = pygame.Surface(self.screen_dim, 0, 32)
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode(self.screen_dim, 0, 32)
+
         self.clock = pygame.time.Clock()
 
     def _setAction(self, action, last_action):
         """
-        Pushes the action to the pygame event queue.
+        Hands the action to the game for its next step. Once called the game
+        stops reading keys from the pygame event queue.
         """
-        if action is None:
-            action = self.NOOP
-
-        if last_action is None:
-            last_action = self.NOOP
+        self._agent_input = True
+        self._action = action
 
-        kd = pygame.event.Event(KEYDOWN, {"key": action})
-        ku = pygame.event.Event(KEYUP, {"key": last_action})
+    def _get_keys(self):
+        """
+        Returns the keys pressed since the last call. Games should read their
+        input through this instead of `pygame.event.get`.
 
-        pygame.event.post(kd)
-        pygame.event.post(ku)
+        The key set by the agent is returned once, or the keys if it set a
+        tuple of them. Without an agent, eg. a human playing, the keys are
+        read from the pygame event queue. Headless games have no event queue.
+        """
+        if self._agent_input or self.headless:
+            key = self._action
+            self._action = None
+            if isinstance(key, tuple):
+                return key
+            if key is None or key == self.NOOP:
+                return ()
+            return (key,)
+
+        keys = []
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                pygame.quit()
+                sys.exit()
+
+            if event.type == KEYDOWN:
+                keys.append(event.key)
+
+        return keys
 
     def _draw_frame(self, draw_screen):
         """
         Decides if the screen will be drawn too
         """
 
-        if draw_screen == True:
+        if draw_screen == True and not self.headless:
             pygame.display.update()
 
-    def getScreenRGB(self):
+    def getScreenRGB(self, out=None):
         """
         Returns the current game screen in RGB format.
 
+        Parameters
+        ----------
+        out : numpy uint8 array (default: None)
+            If given the screen is copied into this array, which must have
+            the shape (width, height, 3), and it is returned.
+
         Returns
         --------
         numpy uint8 array
             Returns a numpy array with the shape (width, height, 3).
 
         """
+        # a view straight onto the surface pixels. It locks the surface so
+        # it is dropped as soon as the copy is made.
+        pixels = pygame.surfarray.pixels3d(self.screen)
 
-        return pygame.surfarray.array3d(
-            pygame.display.get_surface()).astype(np.uint8)
+        if out is None:
+            out = np.array(pixels)
+        else:
+            np.copyto(out, pixels)
+
+        del pixels
+
+        return out
 
     def tick(self, fps):
         """
@@ -141,6 +192,46 @@ class PyGameWrapper(object):
         """
         return None
 
+    def getGameStateFields(self):
+        """
+        Gets the names of the entries in :func:`getGameStateVector`.
+
+        Returns
+        -------
+        tuple of str or None
+            tuple if the game supports it and None otherwise.
+
+        """
+        return None
+
+    def getGameStateVector(self, out=None):
+        """
+        Gets the non-visual state as a flat float32 array. The layout is
+        fixed for a game instance and described by :func:`getGameStateFields`.
+
+        Parameters
+        ----------
+        out : numpy float32 array (default: None)
+            If given the state is written into this array, which must have
+            the shape (len(fields),), and it is returned.
+
+        Returns
+        -------
+        numpy float32 array or None
+            array if the game supports it and None otherwise.
+
+        """
+        return None
+
+    def _state_vector(self, out):
+        """
+        Returns out, or a new state vector if it is None.
+        """
+        if out is None:
+            out = np.empty(len(self.getGameStateFields()), dtype=np.float32)
+
+        return out
+
     def getScreenDims(self):
         """
         Gets the screen dimensions of the game in tuple form.
@@ -215,3 +306,13 @@ class PyGameWrapper(object):
 
         """
         raise NotImplementedError("Please override this method")
+
+    def render(self):
+        """
+        Draws the current state of the game onto the screen. PLE only calls
+        this for frames that are displayed or observed, so games should
+        keep drawing out of step().
+
+        Games that still draw inside step() can leave this as is.
+        """
+        pass
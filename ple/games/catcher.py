@@ -1,4 +1,3 @@
-import sys
 import pygame
 from .utils import percent_round_int
 
@@ -150,19 +149,12 @@ class Catcher(base.PyGameWrapper):
 
     def _handle_player_events(self):
         self.dx = 0.0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        for key in self._get_keys():
+            if key == self.actions['left']:
+                self.dx -= self.player_speed
 
-            if event.type == pygame.KEYDOWN:
-                key = event.key
-
-                if key == self.actions['left']:
-                    self.dx -= self.player_speed
-
-                if key == self.actions['right']:
-                    self.dx += self.player_speed
+            if key == self.actions['right']:
+                self.dx += self.player_speed
 
     def init(self):
         self.score = 0
@@ -201,6 +193,18 @@ class Catcher(base.PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        return ("player_x", "player_vel", "fruit_x", "fruit_y")
+
+    def getGameStateVector(self, out=None):
+        out = self._state_vector(out)
+        out[0] = self.player.rect.center[0]
+        out[1] = self.player.vel
+        out[2] = self.fruit.rect.center[0]
+        out[3] = self.fruit.rect.center[1]
+
+        return out
+
     def getScore(self):
         return self.score
 
@@ -208,7 +212,6 @@ class Catcher(base.PyGameWrapper):
         return self.lives == 0
 
     def step(self, dt):
-        self.screen.fill((0, 0, 0))
         self._handle_player_events()
 
         self.score += self.rewards["tick"]
@@ -228,6 +231,8 @@ class Catcher(base.PyGameWrapper):
         if self.lives == 0:
             self.score += self.rewards["loss"]
 
+    def render(self):
+        self.screen.fill((0, 0, 0))
         self.player.draw(self.screen)
         self.fruit.draw(self.screen)
 
@@ -247,4 +252,5 @@ if __name__ == "__main__":
             game.reset()
 
         game.step(dt)
+        game.render()
         pygame.display.update()
@@ -1,10 +1,10 @@
 import os
-import sys
 import numpy as np
 
 import pygame
 from pygame.constants import K_w
 from .. import base
+from ..utils.assets import load_image
 
 
 class BirdPlayer(pygame.sprite.Sprite):
@@ -150,13 +150,14 @@ class Backdrop():
         self.speed = 4.0 * scale
         self.max_move = self.base_image.get_width() - self.background_image.get_width()
 
-    def update_draw_base(self, screen, dt):
+    def update_base(self, dt):
         # the extra is on the right
         if self.x > -1 * self.max_move:
             self.x -= self.speed
         else:
             self.x = 0
 
+    def draw_base(self, screen):
         screen.blit(self.base_image, (self.x, self.SCREEN_HEIGHT * 0.79))
 
     def draw_background(self, screen):
@@ -201,12 +202,8 @@ class FlappyBird(base.PyGameWrapper):
         self.pipe_color = "red"
         self.images = {}
 
-        # so we can preload images
-        pygame.display.set_mode((1, 1), pygame.NOFRAME)
-
         self._dir_ = os.path.dirname(os.path.abspath(__file__))
         self._asset_dir = os.path.join(self._dir_, "assets/")
-        self._load_images()
 
         self.pipe_offsets = [0, self.width * 0.5, self.width]
         self.init_pos = (
@@ -222,7 +219,8 @@ class FlappyBird(base.PyGameWrapper):
         self.pipe_group = None
 
     def _load_images(self):
-        # preload and convert all the images so its faster when we reset
+        # preload and convert all the images so its faster when we reset.
+        # done on the first init so the display, if any, is set up by then.
         self.images["player"] = {}
         for c in ["red", "blue", "yellow"]:
             image_assets = [
@@ -231,29 +229,31 @@ class FlappyBird(base.PyGameWrapper):
                 os.path.join(self._asset_dir, "%sbird-downflap.png" % c),
             ]
 
-            self.images["player"][c] = [pygame.image.load(
-                im).convert_alpha() for im in image_assets]
+            self.images["player"][c] = [
+                load_image(im, alpha=True) for im in image_assets]
 
         self.images["background"] = {}
         for b in ["day", "night"]:
             path = os.path.join(self._asset_dir, "background-%s.png" % b)
 
-            self.images["background"][b] = pygame.image.load(path).convert()
+            self.images["background"][b] = load_image(path)
 
         self.images["pipes"] = {}
         for c in ["red", "green"]:
             path = os.path.join(self._asset_dir, "pipe-%s.png" % c)
 
             self.images["pipes"][c] = {}
-            self.images["pipes"][c]["lower"] = pygame.image.load(
-                path).convert_alpha()
+            self.images["pipes"][c]["lower"] = load_image(path, alpha=True)
             self.images["pipes"][c]["upper"] = pygame.transform.rotate(
                 self.images["pipes"][c]["lower"], 180)
 
         path = os.path.join(self._asset_dir, "base.png")
-        self.images["base"] = pygame.image.load(path).convert()
+        self.images["base"] = load_image(path)
 
     def init(self):
+        if not self.images:
+            self._load_images()
+
         if self.backdrop is None:
             self.backdrop = Backdrop(
                 self.width,
@@ -317,18 +317,7 @@ class FlappyBird(base.PyGameWrapper):
             See code for structure.
 
         """
-        pipes = []
-        for p in self.pipe_group:
-            if p.x + p.width/2 > self.player.pos_x  :
-                pipes.append((p, p.x + p.width/2 - self.player.pos_x ))
-
-        pipes.sort(key=lambda p: p[1])
-
-        next_pipe = pipes[1][0]
-        next_next_pipe = pipes[0][0]
-
-        if next_next_pipe.x < next_pipe.x:
-            next_pipe, next_next_pipe = next_next_pipe, next_pipe
+        next_pipe, next_next_pipe = self._next_pipes()
 
         state = {
             "player_y": self.player.pos_y,
@@ -345,6 +334,43 @@ class FlappyBird(base.PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        return ("player_y", "player_vel",
+                "next_pipe_dist_to_player", "next_pipe_top_y",
+                "next_pipe_bottom_y", "next_next_pipe_dist_to_player",
+                "next_next_pipe_top_y", "next_next_pipe_bottom_y")
+
+    def getGameStateVector(self, out=None):
+        out = self._state_vector(out)
+        next_pipe, next_next_pipe = self._next_pipes()
+
+        out[0] = self.player.pos_y
+        out[1] = self.player.vel
+        out[2] = next_pipe.x + next_pipe.width/2 - self.player.pos_x
+        out[3] = next_pipe.gap_start
+        out[4] = next_pipe.gap_start + self.pipe_gap
+        out[5] = next_next_pipe.x + next_next_pipe.width/2 - self.player.pos_x
+        out[6] = next_next_pipe.gap_start
+        out[7] = next_next_pipe.gap_start + self.pipe_gap
+
+        return out
+
+    def _next_pipes(self):
+        pipes = []
+        for p in self.pipe_group:
+            if p.x + p.width/2 > self.player.pos_x  :
+                pipes.append((p, p.x + p.width/2 - self.player.pos_x ))
+
+        pipes.sort(key=lambda p: p[1])
+
+        next_pipe = pipes[1][0]
+        next_next_pipe = pipes[0][0]
+
+        if next_next_pipe.x < next_pipe.x:
+            next_pipe, next_next_pipe = next_next_pipe, next_pipe
+
+        return next_pipe, next_next_pipe
+
     def getScore(self):
         return self.score
 
@@ -371,15 +397,9 @@ class FlappyBird(base.PyGameWrapper):
             pipe.init(start_gap, self.pipe_gap, offset, self.pipe_color)
 
     def _handle_player_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                key = event.key
-                if key == self.actions['up']:
-                    self.player.flap()
+        for key in self._get_keys():
+            if key == self.actions['up']:
+                self.player.flap()
 
     def game_over(self):
         return self.lives <= 0
@@ -430,11 +450,13 @@ class FlappyBird(base.PyGameWrapper):
 
         self.player.update(dt)
         self.pipe_group.update(dt)
+        self.backdrop.update_base(dt)
 
         if self.lives <= 0:
             self.score += self.rewards["loss"]
 
+    def render(self):
         self.backdrop.draw_background(self.screen)
         self.pipe_group.draw(self.screen)
-        self.backdrop.update_draw_base(self.screen, dt)
+        self.backdrop.draw_base(self.screen)
         self.player.draw(self.screen)
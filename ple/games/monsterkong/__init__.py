@@ -1,22 +1,26 @@
 __author__ = 'Batchu Vishal'
 import pygame
-import sys
-from pygame.constants import K_a, K_d, K_SPACE, K_w, K_s, QUIT, KEYDOWN
+from pygame.constants import K_a, K_d, K_SPACE, K_w, K_s
 from .board import Board
 #from ..base import base
 #from ple.games import base
 from ple.games.base.pygamewrapper import PyGameWrapper
+from ple.games.utils.assets import load_image
 import numpy as np
 import os
 
 
 class MonsterKong(PyGameWrapper):
 
-    def __init__(self):
+    def __init__(self, levelSeeds=None):
         """
         Parameters
         ----------
-        None
+        levelSeeds : list of int (default: None)
+            If given every episode is played on the level made from one of
+            these seeds, picked with the game's rng. Each level is only
+            generated once per process, the 128 most recently used levels
+            are kept. By default every episode generates a new level.
 
         """
 
@@ -44,23 +48,29 @@ class MonsterKong(PyGameWrapper):
         self.allowed_fps = 30
 
         self._dir = os.path.dirname(os.path.abspath(__file__))
+        self.levelSeeds = levelSeeds
 
         self.IMAGES = {
-            "right": pygame.image.load(os.path.join(self._dir, 'assets/right.png')),
-            "right2": pygame.image.load(os.path.join(self._dir, 'assets/right2.png')),
-            "left": pygame.image.load(os.path.join(self._dir, 'assets/left.png')),
-            "left2": pygame.image.load(os.path.join(self._dir, 'assets/left2.png')),
-            "still": pygame.image.load(os.path.join(self._dir, 'assets/still.png'))
+            "right": load_image(os.path.join(self._dir, 'assets/right.png'), alpha=True),
+            "right2": load_image(os.path.join(self._dir, 'assets/right2.png'), alpha=True),
+            "left": load_image(os.path.join(self._dir, 'assets/left.png'), alpha=True),
+            "left2": load_image(os.path.join(self._dir, 'assets/left2.png'), alpha=True),
+            "still": load_image(os.path.join(self._dir, 'assets/still.png'), alpha=True)
         }
 
     def init(self):
+        levelSeed = None
+        if self.levelSeeds is not None:
+            levelSeed = self.levelSeeds[self.rng.randint(len(self.levelSeeds))]
+
         # Create a new instance of the Board class
         self.newGame = Board(
             self.width,
             self.height,
             self.rewards,
             self.rng,
-            self._dir)
+            self._dir,
+            levelSeed)
 
         # Initialize the fireball timer
         self.fireballTimer = 0
@@ -70,6 +80,10 @@ class MonsterKong(PyGameWrapper):
         self.wallGroup = self.newGame.wallGroup
         self.ladderGroup = self.newGame.ladderGroup
 
+        # collisions with the walls and ladders are looked up by tile
+        self.wallGrid = self.newGame.wallGrid
+        self.ladderGrid = self.newGame.ladderGrid
+
     def getScore(self):
         return self.newGame.score
 
@@ -100,21 +114,16 @@ class MonsterKong(PyGameWrapper):
         for coin in self.coinGroup:
             coin.animateCoin()
 
-        # To check collisions below, we move the player downwards then check
-        # and move him back to his original location
-        self.newGame.Players[0].updateY(2)
+        # To check collisions below, we check the tiles the player would
+        # touch 2px further down
         self.laddersCollidedBelow = self.newGame.Players[
-            0].checkCollision(self.ladderGroup)
+            0].checkCollision(self.ladderGrid, 2)
         self.wallsCollidedBelow = self.newGame.Players[
-            0].checkCollision(self.wallGroup)
-        self.newGame.Players[0].updateY(-2)
+            0].checkCollision(self.wallGrid, 2)
 
-        # To check for collisions above, we move the player up then check and
-        # then move him back down
-        self.newGame.Players[0].updateY(-2)
+        # To check for collisions above, we do the same 2px further up
         self.wallsCollidedAbove = self.newGame.Players[
-            0].checkCollision(self.wallGroup)
-        self.newGame.Players[0].updateY(2)
+            0].checkCollision(self.wallGrid, -2)
 
         # Sets the onLadder state of the player
         self.newGame.ladderCheck(
@@ -122,96 +131,92 @@ class MonsterKong(PyGameWrapper):
             self.wallsCollidedBelow,
             self.wallsCollidedAbove)
 
-        for event in pygame.event.get():
-            # Exit to desktop
-            if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == KEYDOWN:
-                # Get the ladders collided with the player
-                self.laddersCollidedExact = self.newGame.Players[
-                    0].checkCollision(self.ladderGroup)
-                if (event.key == self.actions["jump"] and self.newGame.Players[0].onLadder == 0) or (
-                        event.key == self.actions["up"] and self.laddersCollidedExact):
-                    # Set the player to move up
-                    self.direction = 2
-                    if self.newGame.Players[
-                            0].isJumping == 0 and self.wallsCollidedBelow:
-                        # We can make the player jump and set his
-                        # currentJumpSpeed
-                        self.newGame.Players[0].isJumping = 1
-                        self.newGame.Players[0].currentJumpSpeed = 7
-
-                if event.key == self.actions["right"]:
-                    if self.newGame.direction != 4:
-                        self.newGame.direction = 4
-                        self.newGame.cycles = -1  # Reset cycles
-                    self.newGame.cycles = (self.newGame.cycles + 1) % 4
-                    if self.newGame.cycles < 2:
-                        # Display the first image for half the cycles
-                        self.newGame.Players[0].updateWH(self.IMAGES["right"], "H",
-                                                         self.newGame.Players[0].getSpeed(), 15, 15)
-                    else:
-                        # Display the second image for half the cycles
-                        self.newGame.Players[0].updateWH(self.IMAGES["right2"], "H",
-                                                         self.newGame.Players[0].getSpeed(), 15, 15)
-                    wallsCollidedExact = self.newGame.Players[
-                        0].checkCollision(self.wallGroup)
-                    if wallsCollidedExact:
-                        # If we have collided a wall, move the player back to
-                        # where he was in the last state
-                        self.newGame.Players[0].updateWH(self.IMAGES["right"], "H",
-                                                         -self.newGame.Players[0].getSpeed(), 15, 15)
-
-                if event.key == self.actions["left"]:
-                    if self.newGame.direction != 3:
-                        self.newGame.direction = 3
-                        self.newGame.cycles = -1  # Reset cycles
-                    self.newGame.cycles = (self.newGame.cycles + 1) % 4
-                    if self.newGame.cycles < 2:
-                        # Display the first image for half the cycles
-                        self.newGame.Players[0].updateWH(self.IMAGES["left"], "H",
-                                                         -self.newGame.Players[0].getSpeed(), 15, 15)
-                    else:
-                        # Display the second image for half the cycles
-                        self.newGame.Players[0].updateWH(self.IMAGES["left2"], "H",
-                                                         -self.newGame.Players[0].getSpeed(), 15, 15)
-                    wallsCollidedExact = self.newGame.Players[
-                        0].checkCollision(self.wallGroup)
-                    if wallsCollidedExact:
-                        # If we have collided a wall, move the player back to
-                        # where he was in the last state
-                        self.newGame.Players[0].updateWH(self.IMAGES["left"], "H",
-                                                         self.newGame.Players[0].getSpeed(), 15, 15)
-
-                # If we are on a ladder, then we can move up
-                if event.key == self.actions[
-                        "up"] and self.newGame.Players[0].onLadder:
-                    self.newGame.Players[0].updateWH(self.IMAGES["still"], "V",
-                                                     -self.newGame.Players[0].getSpeed() / 2, 15, 15)
-                    if len(self.newGame.Players[0].checkCollision(self.ladderGroup)) == 0 or len(
-                            self.newGame.Players[0].checkCollision(self.wallGroup)) != 0:
-                        self.newGame.Players[0].updateWH(self.IMAGES["still"], "V",
-                                                         self.newGame.Players[0].getSpeed() / 2, 15, 15)
-
-                # If we are on a ladder, then we can move down
-                if event.key == self.actions[
-                        "down"] and self.newGame.Players[0].onLadder:
+        for key in self._get_keys():
+            # Get the ladders collided with the player
+            self.laddersCollidedExact = self.newGame.Players[
+                0].checkCollision(self.ladderGrid)
+            if (key == self.actions["jump"] and self.newGame.Players[0].onLadder == 0) or (
+                    key == self.actions["up"] and self.laddersCollidedExact):
+                # Set the player to move up
+                self.direction = 2
+                if self.newGame.Players[
+                        0].isJumping == 0 and self.wallsCollidedBelow:
+                    # We can make the player jump and set his
+                    # currentJumpSpeed
+                    self.newGame.Players[0].isJumping = 1
+                    self.newGame.Players[0].currentJumpSpeed = 7
+
+            if key == self.actions["right"]:
+                if self.newGame.direction != 4:
+                    self.newGame.direction = 4
+                    self.newGame.cycles = -1  # Reset cycles
+                self.newGame.cycles = (self.newGame.cycles + 1) % 4
+                if self.newGame.cycles < 2:
+                    # Display the first image for half the cycles
+                    self.newGame.Players[0].updateWH(self.IMAGES["right"], "H",
+                                                     self.newGame.Players[0].getSpeed(), 15, 15)
+                else:
+                    # Display the second image for half the cycles
+                    self.newGame.Players[0].updateWH(self.IMAGES["right2"], "H",
+                                                     self.newGame.Players[0].getSpeed(), 15, 15)
+                wallsCollidedExact = self.newGame.Players[
+                    0].checkCollision(self.wallGrid)
+                if wallsCollidedExact:
+                    # If we have collided a wall, move the player back to
+                    # where he was in the last state
+                    self.newGame.Players[0].updateWH(self.IMAGES["right"], "H",
+                                                     -self.newGame.Players[0].getSpeed(), 15, 15)
+
+            if key == self.actions["left"]:
+                if self.newGame.direction != 3:
+                    self.newGame.direction = 3
+                    self.newGame.cycles = -1  # Reset cycles
+                self.newGame.cycles = (self.newGame.cycles + 1) % 4
+                if self.newGame.cycles < 2:
+                    # Display the first image for half the cycles
+                    self.newGame.Players[0].updateWH(self.IMAGES["left"], "H",
+                                                     -self.newGame.Players[0].getSpeed(), 15, 15)
+                else:
+                    # Display the second image for half the cycles
+                    self.newGame.Players[0].updateWH(self.IMAGES["left2"], "H",
+                                                     -self.newGame.Players[0].getSpeed(), 15, 15)
+                wallsCollidedExact = self.newGame.Players[
+                    0].checkCollision(self.wallGrid)
+                if wallsCollidedExact:
+                    # If we have collided a wall, move the player back to
+                    # where he was in the last state
+                    self.newGame.Players[0].updateWH(self.IMAGES["left"], "H",
+                                                     self.newGame.Players[0].getSpeed(), 15, 15)
+
+            # If we are on a ladder, then we can move up
+            if key == self.actions[
+                    "up"] and self.newGame.Players[0].onLadder:
+                self.newGame.Players[0].updateWH(self.IMAGES["still"], "V",
+                                                 -self.newGame.Players[0].getSpeed() / 2, 15, 15)
+                if len(self.newGame.Players[0].checkCollision(self.ladderGrid)) == 0 or len(
+                        self.newGame.Players[0].checkCollision(self.wallGrid)) != 0:
                     self.newGame.Players[0].updateWH(self.IMAGES["still"], "V",
                                                      self.newGame.Players[0].getSpeed() / 2, 15, 15)
 
+            # If we are on a ladder, then we can move down
+            if key == self.actions[
+                    "down"] and self.newGame.Players[0].onLadder:
+                self.newGame.Players[0].updateWH(self.IMAGES["still"], "V",
+                                                 self.newGame.Players[0].getSpeed() / 2, 15, 15)
+
         # Update the player's position and process his jump if he is jumping
         self.newGame.Players[0].continuousUpdate(
-            self.wallGroup, self.ladderGroup)
+            self.wallGrid, self.ladderGrid)
 
         '''
         We use cycles to animate the character, when we change direction we also reset the cycles
         We also change the direction according to the key pressed
         '''
 
-        # Redraws all our instances onto the screen
-        self.newGame.redrawScreen(self.screen, self.width, self.height)
+        # The screen shows the game at this point of the step, before the
+        # fireballs, coins and monsters are updated. Only where everything
+        # is is kept, render() draws it when the screen is needed
+        self.newGame.captureScreen()
 
         # Update the fireball and check for collisions with player (ie Kill the
         # player)
@@ -227,4 +232,8 @@ class MonsterKong(PyGameWrapper):
 
         # Update all the monsters
         for enemy in self.newGame.Enemies:
-            enemy.continuousUpdate(self.wallGroup, self.ladderGroup)
+            enemy.continuousUpdate(self.wallGrid, self.ladderGrid)
+
+    def render(self):
+        # Redraws all our instances onto the screen
+        self.newGame.redrawScreen(self.screen, self.width, self.height)
@@ -3,6 +3,8 @@ import pygame
 import math
 import sys
 import os
+import numpy as np
+from collections import OrderedDict
 
 from .person import Person
 from .onBoard import OnBoard
@@ -10,6 +12,14 @@ from .coin import Coin
 from .player import Player
 from .fireball import Fireball
 from .monsterPerson import MonsterPerson
+from .tileGrid import TileGrid
+from ..utils.assets import load_image
+
+# (seed, width, height) -> (map, coin cells) of the levels made from a seed,
+# shared by every board in the process. Only the most recently used levels
+# are kept.
+_levels = OrderedDict()
+_maxLevels = 128
 
 
 class Board(object):
@@ -19,7 +29,7 @@ class Board(object):
     The generation of the level also happens in this class.
     '''
 
-    def __init__(self, width, height, rewards, rng, _dir):
+    def __init__(self, width, height, rewards, rng, _dir, levelSeed=None):
         self.__width = width
         self.__actHeight = height
         self.__height = self.__actHeight + 10
@@ -29,15 +39,17 @@ class Board(object):
         self.cycles = 0  # For the characters animation
         self.direction = 0
         self._dir = _dir
+        # When given the level is made from this seed instead of the rng
+        self.levelSeed = levelSeed
 
         self.IMAGES = {
-            "still": pygame.image.load(os.path.join(_dir, 'assets/still.png')).convert_alpha(),
-            "monster0": pygame.image.load(os.path.join(_dir, 'assets/monster0.png')).convert_alpha(),
-            "princess": pygame.image.load(os.path.join(_dir, 'assets/princess.png')).convert_alpha(),
-            "fireballright": pygame.image.load(os.path.join(_dir, 'assets/fireballright.png')).convert_alpha(),
-            "coin1": pygame.image.load(os.path.join(_dir, 'assets/coin1.png')).convert_alpha(),
-            "wood_block": pygame.image.load(os.path.join(_dir, 'assets/wood_block.png')).convert_alpha(),
-            "ladder": pygame.image.load(os.path.join(_dir, 'assets/ladder.png')).convert_alpha()
+            "still": load_image(os.path.join(_dir, 'assets/still.png'), alpha=True),
+            "monster0": load_image(os.path.join(_dir, 'assets/monster0.png'), alpha=True),
+            "princess": load_image(os.path.join(_dir, 'assets/princess.png'), alpha=True),
+            "fireballright": load_image(os.path.join(_dir, 'assets/fireballright.png'), alpha=True),
+            "coin1": load_image(os.path.join(_dir, 'assets/coin1.png'), (15, 15), alpha=True),
+            "wood_block": load_image(os.path.join(_dir, 'assets/wood_block.png'), (15, 15), alpha=True),
+            "ladder": load_image(os.path.join(_dir, 'assets/ladder.png'), (15, 15), alpha=True)
         }
 
         self.white = (255, 255, 255)
@@ -55,24 +67,13 @@ class Board(object):
         self.Coins = []
         self.Walls = []
         self.Ladders = []
-        self.Fireballs = []
         self.Boards = []
         self.FireballEndpoints = []
 
-        # Resets the above groups and initializes the game for us
-        self.resetGroups()
-
-        # Initialize the instance groups which we use to display our instances
+        # Resets the above groups and initializes the game for us, this also
+        # creates the instance groups which we use to display our instances
         # on the screen
-        self.fireballGroup = pygame.sprite.RenderPlain(self.Fireballs)
-        self.playerGroup = pygame.sprite.RenderPlain(self.Players)
-        self.enemyGroup = pygame.sprite.RenderPlain(self.Enemies)
-        self.wallGroup = pygame.sprite.RenderPlain(self.Walls)
-        self.ladderGroup = pygame.sprite.RenderPlain(self.Ladders)
-        self.coinGroup = pygame.sprite.RenderPlain(self.Coins)
-        self.allyGroup = pygame.sprite.RenderPlain(self.Allies)
-        self.fireballEndpointsGroup = pygame.sprite.RenderPlain(
-            self.FireballEndpoints)
+        self.resetGroups()
 
     def resetGroups(self):
         self.score = 0
@@ -97,69 +98,68 @@ class Board(object):
         self.Coins = []
         self.Walls = []
         self.Ladders = []
-        self.Fireballs = []
         self.FireballEndpoints = [OnBoard(self.IMAGES["still"], (50, 440))]
-        self.initializeGame()  # This initializes the game and generates our map
-        self.createGroups()  # This creates the instance groups
+        # This initializes the game, generates our map and creates the
+        # instance groups
+        self.initializeGame()
 
     # Checks to destroy a fireball when it reaches its terminal point
     def checkFireballDestroy(self, fireball):
         if pygame.sprite.spritecollide(
                 fireball, self.fireballEndpointsGroup, False):
-            # We use indices on fireballs to uniquely identify each fireball
-            self.DestroyFireball(fireball.index)
+            self.DestroyFireball(fireball)
 
-    # Creates a new fireball and adds it to our fireball group
+    # Creates a new fireball and adds it to our fireball group. The group is
+    # the only place the fireballs are kept
     def CreateFireball(self, location, monsterIndex):
-        if len(self.Fireballs) < len(self.Enemies) * 5:
-            self.Fireballs.append(
-                Fireball(self.IMAGES["fireballright"], (location[0], location[1] + 15), len(self.Fireballs),
-                         2 + len(self.Enemies) / 2, self.rng, self._dir))
+        if len(self.fireballGroup) < len(self.Enemies) * 5:
+            fireball = Fireball(self.IMAGES["fireballright"], (location[0], location[1] + 15),
+                                2 + len(self.Enemies) / 2, self.rng, self._dir)
             # Starts monster's animation
             self.Enemies[monsterIndex].setStopDuration(15)
             self.Enemies[monsterIndex].setPosition(
                 (self.Enemies[monsterIndex].getPosition()[0], self.Enemies[monsterIndex].getPosition()[1] - 12))
             self.Enemies[monsterIndex].setCenter(
                 self.Enemies[monsterIndex].getPosition())
-            self.createGroups()  # We recreate the groups so the fireball is added
+            self.fireballGroup.add(fireball)
 
     # Destroy a fireball if it has collided with a player or reached its
     # endpoint
-    def DestroyFireball(self, index):
-        for fireBall in range(len(self.Fireballs)):
-            if self.Fireballs[fireBall].index == index:
-                self.Fireballs.remove(self.Fireballs[fireBall])
-                for fireBallrem in range(
-                        len(self.Fireballs)):  # We need to reduce the indices of all fireballs greater than this
-                    if self.Fireballs[fireBallrem].index > index:
-                        self.Fireballs[fireBallrem].index -= 1
-                self.createGroups()  # Recreate the groups so the fireball is removed
-                break
+    def DestroyFireball(self, fireball):
+        self.fireballGroup.remove(fireball)
 
     # Randomly Generate coins in the level where there is a wall below the
-    # coin so the player can reach it
-    def GenerateCoins(self):
-        for i in range(6, len(self.map)):
-            for j in range(len(self.map[i])):
-                if self.map[i][j] == 0 and ((i + 1 < len(self.map) and self.map[i + 1][j] == 1) or (
-                        i + 2 < len(self.map) and self.map[i + 2][j] == 1)):
-                    randNumber = math.floor(self.rng.rand() * 1000)
-                    if randNumber % 35 == 0 and len(
-                            self.Coins) <= 25:  # At max there will be 26 coins in the map
-                        self.map[i][j] = 3
-                        if j - 1 >= 0 and self.map[i][j - 1] == 3:
-                            self.map[i][j] = 0
-                        if self.map[i][j] == 3:
-                            # Add the coin to our coin list
-                            self.Coins.append(
-                                Coin(
-                                    self.IMAGES["coin1"],
-                                    (j * 15 + 15 / 2,
-                                     i * 15 + 15 / 2),
-                                    self._dir))
-        if len(
-                self.Coins) <= 15:  # If there are less than 21 coins, we call the function again
-            self.GenerateCoins()
+    # coin so the player can reach it. The free cells are drawn for all at
+    # once, in the same order and with the same draws as one at a time
+    def GenerateCoins(self, rng=None):
+        if rng is None:
+            rng = self.rng
+
+        # Cells with a wall one or two blocks below them
+        walls = self.map == 1
+        wallBelow = np.zeros_like(walls)
+        wallBelow[:-1] |= walls[1:]
+        wallBelow[:-2] |= walls[2:]
+        wallBelow[:6] = False
+
+        # If there are 15 coins or less we go over the free cells again
+        while len(self.Coins) <= 15:
+            cells = np.argwhere(wallBelow & (self.map == 0))
+            randNumbers = np.floor(rng.rand(len(cells)) * 1000)
+            for i, j in cells[randNumbers % 35 == 0].tolist():
+                if len(self.Coins) > 25:  # At max there will be 26 coins in the map
+                    break
+                # No coin right next to another
+                if j - 1 >= 0 and self.map[i, j - 1] == 3:
+                    continue
+                self.map[i, j] = 3
+                # Add the coin to our coin list
+                self.Coins.append(
+                    Coin(
+                        self.IMAGES["coin1"],
+                        (j * 15 + 15 / 2,
+                         i * 15 + 15 / 2),
+                        self._dir))
 
     # Given a position and checkNo ( 1 for wall, 2 for ladder, 3 for coin) the
     # function tells us if its a valid position to place or not
@@ -174,56 +174,83 @@ class Board(object):
                 return 1
         return 0
 
-    # Create an empty 2D map of 30x80 size
+    # Create an empty 2D map with a block for every 15x15 pixels
     def makeMap(self):
-        for point in range(0, int(self.__height / 15 + 1)):
-            row = []
-            for point2 in range(0, int(self.__width / 15)):
-                row.append(0)
-            self.map.append(row)
+        self.map = np.zeros(
+            (int(self.__height / 15 + 1), int(self.__width / 15)), dtype=int)
 
     # Add walls to our map boundaries and also the floors
     def makeWalls(self):
-        for i in range(0, int(self.__height / 15)):
-            self.map[i][0] = self.map[i][int(self.__width / 15 - 1)] = 1
-        for i in range(2, int(self.__height / (15 * 4))):
-            for j in range(0, int(self.__width / 15)):
-                self.map[i * 5][j] = 1
+        self.map[:int(self.__height / 15), 0] = 1
+        self.map[:int(self.__height / 15), int(self.__width / 15 - 1)] = 1
+        # Every 5th row from the 10th is a floor
+        self.map[10:int(self.__height / (15 * 4)) * 5:5, :] = 1
 
     # Make a small chamber on the top where the princess resides
     def makePrincessChamber(self):
-        for j in range(0, 4):
-            self.map[j][9] = 1
-
-        for j in range(0, 10):
-            self.map[4][j] = 1
-
-        for j in range(0, 6):
-            self.map[1 * 4 + j][7] = self.map[1 * 4 + j][8] = 2
+        self.map[0:4, 9] = 1
+        self.map[4, 0:10] = 1
+        self.map[4:10, 7:9] = 2
 
     # Generate ladders randomly, 1 for each floor such that they are not too
     # close to each other
-    def makeLadders(self):
+    def makeLadders(self, rng=None):
+        if rng is None:
+            rng = self.rng
+
         for i in range(2, int(self.__height / (15 * 4) - 1)):
-            ladderPos = math.floor(self.rng.rand() * (self.__width / 15 - 20))
+            ladderPos = math.floor(rng.rand() * (self.__width / 15 - 20))
             ladderPos = int(7 + ladderPos)
             while self.checkMapForMatch(ladderPos, i - 1, 2, 0) == 1:
                 ladderPos = math.floor(
-                    self.rng.rand() * (self.__width / 15 - 20))
+                    rng.rand() * (self.__width / 15 - 20))
                 ladderPos = int(7 + ladderPos)
-            for k in range(0, 5):
-                self.map[i * 5 + k][ladderPos] = self.map[i *
-                                                          5 + k][ladderPos + 1] = 2
+            self.map[i * 5:i * 5 + 5, ladderPos:ladderPos + 2] = 2
 
     # Create the holes on each floor (extreme right and extreme left)
     def makeHoles(self):
+        # Ladders wont interfere since they leave 10 blocks on either side
+        columns = int(self.__width / 15)
         for i in range(3, int(self.__height / (15 * 4) - 1)):
-            for k in range(
-                    1, 6):  # Ladders wont interfere since they leave 10 blocks on either side
-                if i % 2 == 0:
-                    self.map[i * 5][k] = 0
-                else:
-                    self.map[i * 5][int(self.__width / 15 - 1 - k)] = 0
+            if i % 2 == 0:
+                self.map[i * 5, 1:6] = 0
+            else:
+                self.map[i * 5, columns - 6:columns - 1] = 0
+
+    # Generates the map of a new level and its coins with the given rng
+    def generateLevel(self, rng):
+        self.makeMap()
+        self.makeWalls()
+        self.makePrincessChamber()
+        self.makeLadders(rng)
+        self.makeHoles()
+        self.GenerateCoins(rng)
+
+    # Loads the level made from the seed, generating it on first use
+    def loadLevel(self, seed):
+        key = (seed, self.__width, self.__actHeight)
+        if key not in _levels:
+            self.generateLevel(np.random.RandomState(seed))
+            coins = [(int((coin.getPosition()[1] - 15 / 2) / 15),
+                      int((coin.getPosition()[0] - 15 / 2) / 15))
+                     for coin in self.Coins]
+            _levels[key] = (self.map.copy(), coins)
+            # Forget the level used least recently
+            if len(_levels) > _maxLevels:
+                _levels.popitem(last=False)
+            return
+
+        # Move the level to the end, as the most recently used
+        levelMap, coins = _levels.pop(key)
+        _levels[key] = (levelMap, coins)
+        self.map = levelMap.copy()
+        for i, j in coins:
+            self.Coins.append(
+                Coin(
+                    self.IMAGES["coin1"],
+                    (j * 15 + 15 / 2,
+                     i * 15 + 15 / 2),
+                    self._dir))
 
     '''
     This is called once you have finished making holes, ladders, walls etc
@@ -231,22 +258,20 @@ class Board(object):
     '''
 
     def populateMap(self):
-        for x in range(len(self.map)):
-            for y in range(len(self.map[x])):
-                if self.map[x][y] == 1:
-                    # Add a wall at that position
-                    self.Walls.append(
-                        OnBoard(
-                            self.IMAGES["wood_block"],
-                            (y * 15 + 15 / 2,
-                             x * 15 + 15 / 2)))
-                elif self.map[x][y] == 2:
-                    # Add a ladder at that position
-                    self.Ladders.append(
-                        OnBoard(
-                            self.IMAGES["ladder"],
-                            (y * 15 + 15 / 2,
-                             x * 15 + 15 / 2)))
+        for x, y in np.argwhere(self.map == 1).tolist():
+            # Add a wall at that position
+            self.Walls.append(
+                OnBoard(
+                    self.IMAGES["wood_block"],
+                    (y * 15 + 15 / 2,
+                     x * 15 + 15 / 2)))
+        for x, y in np.argwhere(self.map == 2).tolist():
+            # Add a ladder at that position
+            self.Ladders.append(
+                OnBoard(
+                    self.IMAGES["ladder"],
+                    (y * 15 + 15 / 2,
+                     x * 15 + 15 / 2)))
 
     # Check if the player is on a ladder or not
     def ladderCheck(self, laddersCollidedBelow,
@@ -265,13 +290,12 @@ class Board(object):
     # Update all the fireball positions and check for collisions with player
     def fireballCheck(self):
         for fireball in self.fireballGroup:
-            fireball.continuousUpdate(self.wallGroup, self.ladderGroup)
+            fireball.continuousUpdate(self.wallGrid, self.ladderGrid)
             if fireball.checkCollision(self.playerGroup, "V"):
-                self.Fireballs.remove(fireball)
+                self.DestroyFireball(fireball)
                 self.Players[0].setPosition((50, 440))
                 self.score += self.rewards["negative"]
                 self.lives += -1
-                self.createGroups()
             self.checkFireballDestroy(fireball)
 
     # Check for coins collided and add the appropriate score
@@ -281,10 +305,9 @@ class Board(object):
             # We also remove the coin entry from our map
             self.map[int((coin.getPosition()[1] - 15 / 2) /
                      15)][int((coin.getPosition()[0] - 15 / 2) / 15)] = 0
-            # Remove the coin entry from our list
+            # Remove the coin entry from our list, it was already killed
+            # and so removed from the coin group
             self.Coins.remove(coin)
-            # Update the coin group since we modified the coin list
-            self.createGroups()
 
     # Check if the player wins
     def checkVictory(self):
@@ -297,7 +320,6 @@ class Board(object):
 
             # This is just the next level so we only clear the fireballs and
             # regenerate the coins
-            self.Fireballs = []
             self.Players[0].setPosition((50, 440))
             self.Coins = []
             self.GenerateCoins()
@@ -311,24 +333,66 @@ class Board(object):
                 self.Enemies.append(
                     MonsterPerson(
                         self.IMAGES["monster0"], (400, 117), self.rng, self._dir))
-            # Create the groups again so the enemies are effected
-            self.createGroups()
-
-    # Redraws the entire game screen for us
+            # Update only the groups of the new level, the walls and ladders
+            # stay the same
+            self.fireballGroup.empty()
+            self.coinGroup.empty()
+            self.coinGroup.add(*self.Coins)
+            self.enemyGroup.add(*self.Enemies)
+
+    # Draws the parts of the level that never change, the background, the
+    # ladders and the walls, once into a surface of the same format as the
+    # screen. The layer without the walls is kept too, it is what lies
+    # under the player and the coins.
+    def makeStaticLayer(self, screen):
+        self.ladderLayer = screen.copy()
+        self.ladderLayer.fill((40, 20, 0))  # Fill it with black
+        self.ladderGroup.draw(self.ladderLayer)
+        self.staticLayer = self.ladderLayer.copy()
+        self.wallGroup.draw(self.staticLayer)
+
+    # Keeps the images and places of the sprites redrawScreen draws, so a
+    # frame can be drawn later as the game was at this point
+    def captureScreen(self):
+        self.capturedSprites = [
+            [(sprite.image, sprite.rect.copy()) for sprite in group.sprites()]
+            for group in (self.playerGroup, self.coinGroup,
+                          self.fireballGroup, self.enemyGroup,
+                          self.allyGroup)]
+
+    # Redraws the entire game screen for us, as it was when last captured
     def redrawScreen(self, screen, width, height):
-        screen.fill((40, 20, 0))  # Fill it with black
-        # Draw all our groups on the background
-        self.ladderGroup.draw(screen)
-        self.playerGroup.draw(screen)
-        self.coinGroup.draw(screen)
-        self.wallGroup.draw(screen)
-        self.fireballGroup.draw(screen)
-        self.enemyGroup.draw(screen)
-        self.allyGroup.draw(screen)
+        if self.staticLayer is None or \
+                self.staticLayer.get_size() != screen.get_size():
+            self.makeStaticLayer(screen)
+        if self.capturedSprites is None:
+            self.captureScreen()
+
+        players, coins, fireballs, enemies, allies = self.capturedSprites
+
+        # The walls are drawn over the player and the coins, so the walls
+        # they overlap are drawn again on top of them
+        overlapped = []
+        for image, rect in players + coins:
+            rect = pygame.Rect(rect.topleft, image.get_size())
+            for wall in self.wallGrid.collide(rect):
+                if wall not in overlapped:
+                    overlapped.append(wall)
+
+        screen.blit(self.staticLayer, (0, 0))
+        for wall in overlapped:
+            screen.blit(self.ladderLayer, wall.rect, wall.rect)
+        # Draw all our sprites on the background
+        for image, rect in players + coins:
+            screen.blit(image, rect)
+        for wall in overlapped:
+            screen.blit(wall.image, wall.rect)
+        for image, rect in fireballs + enemies + allies:
+            screen.blit(image, rect)
 
     # Update all the groups from their corresponding lists
     def createGroups(self):
-        self.fireballGroup = pygame.sprite.RenderPlain(self.Fireballs)
+        self.fireballGroup = pygame.sprite.RenderPlain()
         self.playerGroup = pygame.sprite.RenderPlain(self.Players)
         self.enemyGroup = pygame.sprite.RenderPlain(self.Enemies)
         self.wallGroup = pygame.sprite.RenderPlain(self.Walls)
@@ -345,11 +409,15 @@ class Board(object):
     '''
 
     def initializeGame(self):
-        self.makeMap()
-        self.makeWalls()
-        self.makePrincessChamber()
-        self.makeLadders()
-        self.makeHoles()
-        self.GenerateCoins()
+        if self.levelSeed is None:
+            self.generateLevel(self.rng)
+        else:
+            self.loadLevel(self.levelSeed)
         self.populateMap()
+        # The walls and ladders never move, so we index them once by tile
+        self.wallGrid = TileGrid(self.Walls)
+        self.ladderGrid = TileGrid(self.Ladders)
+        # They are drawn once too, on the first redraw of the level
+        self.staticLayer = None
+        self.capturedSprites = None
         self.createGroups()
@@ -2,6 +2,7 @@ __author__ = 'Batchu Vishal'
 import pygame
 import os
 from .onBoard import OnBoard
+from ..utils.assets import load_image
 
 
 class Coin(OnBoard):
@@ -16,11 +17,11 @@ class Coin(OnBoard):
         OnBoard.__init__(self, raw_image, position)
         self.__coinAnimState = 0  # Initialize animation state to 0
         self.IMAGES = {
-            "coin1": pygame.transform.scale(pygame.image.load(os.path.join(_dir, 'assets/coin1.png')), (15, 15)).convert_alpha(),
-            "coin2": pygame.transform.scale(pygame.image.load(os.path.join(_dir, 'assets/coin2.png')), (15, 15)).convert_alpha(),
-            "coin3": pygame.transform.scale(pygame.image.load(os.path.join(_dir, 'assets/coin3.png')), (15, 15)).convert_alpha(),
-            "coin4": pygame.transform.scale(pygame.image.load(os.path.join(_dir, 'assets/coin4.png')), (15, 15)).convert_alpha(),
-            "coin5": pygame.transform.scale(pygame.image.load(os.path.join(_dir, 'assets/coin5.png')), (15, 15)).convert_alpha()
+            "coin1": load_image(os.path.join(_dir, 'assets/coin1.png'), (15, 15), alpha=True),
+            "coin2": load_image(os.path.join(_dir, 'assets/coin2.png'), (15, 15), alpha=True),
+            "coin3": load_image(os.path.join(_dir, 'assets/coin3.png'), (15, 15), alpha=True),
+            "coin4": load_image(os.path.join(_dir, 'assets/coin4.png'), (15, 15), alpha=True),
+            "coin5": load_image(os.path.join(_dir, 'assets/coin5.png'), (15, 15), alpha=True)
         }
 
     # Update the image of the coin
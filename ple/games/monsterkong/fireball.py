@@ -3,6 +3,8 @@ import pygame
 import math
 import os
 from .onBoard import OnBoard
+from ..utils.assets import load_image
+from .tileGrid import spritecollide
 
 '''
 This class defines all our fireballs.
@@ -13,18 +15,17 @@ Each fireball can check for collisions in order to decide when to turn and when
 
 class Fireball(OnBoard):
 
-    def __init__(self, raw_image, position, index, speed, rng, dir):
+    def __init__(self, raw_image, position, speed, rng, dir):
         super(Fireball, self).__init__(raw_image, position)
         # Set the fireball direction randomly
         self.rng = rng
         self.__direction = int(math.floor(self.rng.rand() * 100)) % 2
-        self.index = index
         self.wallsBelow = []
         self.laddersBelow = []
 
         self.IMAGES = {
-            "fireballright": pygame.transform.scale(pygame.image.load(os.path.join(dir, 'assets/fireballright.png')), (20, 20)).convert_alpha(),
-            "fireballleft": pygame.transform.scale(pygame.image.load(os.path.join(dir, 'assets/fireballleft.png')), (20, 20)).convert_alpha()
+            "fireballright": load_image(os.path.join(dir, 'assets/fireballright.png'), (20, 20), alpha=True),
+            "fireballleft": load_image(os.path.join(dir, 'assets/fireballleft.png'), (20, 20), alpha=True)
         }
         # The newly spawned fireball is not falling
         self.__fall = 0
@@ -111,24 +112,17 @@ class Fireball(OnBoard):
 
     '''
     We check for collisions in the direction in which we are moving if the parameter direction is "H".
-    The way we do this is move a little forward in the direction in which we are moving, then check for collisions then move back to the original location
+    The way we do this is check for collisions a little forward in the direction in which we are moving
     We check for collisions below the fireball if the parameter direction is "V"
-    We do this by moving down a little, then check for collisions then move back up to the original location
+    We do this by checking for collisions a little lower down
     '''
 
     def checkCollision(self, colliderGroup, direction):
         if direction == "H":
             if self.__direction == 0:
-                self.update(self.image, "H", self.__speed)  # Right collision
-            if self.__direction == 1:
-                self.update(self.image, "H", -self.__speed)  # Left collision
-            Colliders = pygame.sprite.spritecollide(self, colliderGroup, False)
-            if self.__direction == 0:
-                self.update(self.image, "H", -self.__speed)  # Right collision
-            if self.__direction == 1:
-                self.update(self.image, "H", self.__speed)  # Left collision
+                Colliders = spritecollide(self, colliderGroup, dx=self.__speed)  # Right collision
+            else:
+                Colliders = spritecollide(self, colliderGroup, dx=-self.__speed)  # Left collision
         else:
-            self.update(self.image, "V", self.__speed)  # Bottom collision
-            Colliders = pygame.sprite.spritecollide(self, colliderGroup, False)
-            self.update(self.image, "V", -self.__speed)
+            Colliders = spritecollide(self, colliderGroup, dy=self.__speed)  # Bottom collision
         return Colliders
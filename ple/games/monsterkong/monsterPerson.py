@@ -2,6 +2,8 @@ __author__ = 'Erilyth'
 import pygame
 import os
 from .person import Person
+from ..utils.assets import load_image
+from .tileGrid import spritecollide
 
 '''
 This class defines all the Monsters present in our game.
@@ -19,18 +21,18 @@ class MonsterPerson(Person):
         self.__cycles = 0
         self.__stopDuration = 0
         self.IMAGES = {
-            "monster0": pygame.image.load(os.path.join(dir, 'assets/monster0.png')).convert_alpha(),
-            "monster1": pygame.image.load(os.path.join(dir, 'assets/monster1.png')).convert_alpha(),
-            "monster2": pygame.image.load(os.path.join(dir, 'assets/monster2.png')).convert_alpha(),
-            "monster3": pygame.image.load(os.path.join(dir, 'assets/monster3.png')).convert_alpha(),
-            "monster01": pygame.image.load(os.path.join(dir, 'assets/monster01.png')).convert_alpha(),
-            "monster11": pygame.image.load(os.path.join(dir, 'assets/monster11.png')).convert_alpha(),
-            "monster21": pygame.image.load(os.path.join(dir, 'assets/monster21.png')).convert_alpha(),
-            "monster31": pygame.image.load(os.path.join(dir, 'assets/monster31.png')).convert_alpha(),
-            "monsterstill0": pygame.image.load(os.path.join(dir, 'assets/monsterstill0.png')).convert_alpha(),
-            "monsterstill10": pygame.image.load(os.path.join(dir, 'assets/monsterstill10.png')).convert_alpha(),
-            "monsterstill1": pygame.image.load(os.path.join(dir, 'assets/monsterstill1.png')).convert_alpha(),
-            "monsterstill11": pygame.image.load(os.path.join(dir, 'assets/monsterstill11.png')).convert_alpha()
+            "monster0": load_image(os.path.join(dir, 'assets/monster0.png'), alpha=True),
+            "monster1": load_image(os.path.join(dir, 'assets/monster1.png'), alpha=True),
+            "monster2": load_image(os.path.join(dir, 'assets/monster2.png'), alpha=True),
+            "monster3": load_image(os.path.join(dir, 'assets/monster3.png'), alpha=True),
+            "monster01": load_image(os.path.join(dir, 'assets/monster01.png'), alpha=True),
+            "monster11": load_image(os.path.join(dir, 'assets/monster11.png'), alpha=True),
+            "monster21": load_image(os.path.join(dir, 'assets/monster21.png'), alpha=True),
+            "monster31": load_image(os.path.join(dir, 'assets/monster31.png'), alpha=True),
+            "monsterstill0": load_image(os.path.join(dir, 'assets/monsterstill0.png'), alpha=True),
+            "monsterstill10": load_image(os.path.join(dir, 'assets/monsterstill10.png'), alpha=True),
+            "monsterstill1": load_image(os.path.join(dir, 'assets/monsterstill1.png'), alpha=True),
+            "monsterstill11": load_image(os.path.join(dir, 'assets/monsterstill11.png'), alpha=True)
         }
 
     # Getters and Setters
@@ -51,17 +53,10 @@ class MonsterPerson(Person):
     def checkWall(self, colliderGroup):
         if self.__direction == 0:
             # Right collision with wall
-            self.updateWH(self.image, "H", 20, 40, 40)
-        if self.__direction == 1:
-            # Left collision with wall
-            self.updateWH(self.image, "H", -20, 40, 40)
-        Colliders = pygame.sprite.spritecollide(self, colliderGroup, False)
-        if self.__direction == 0:
-            # Right collision with wall
-            self.updateWH(self.image, "H", -20, 40, 40)
-        if self.__direction == 1:
+            Colliders = spritecollide(self, colliderGroup, dx=20)
+        else:
             # Left collision with wall
-            self.updateWH(self.image, "H", 20, 40, 40)
+            Colliders = spritecollide(self, colliderGroup, dx=-20)
         return Colliders
 
     # This is used to animate the monster
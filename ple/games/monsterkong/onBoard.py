@@ -13,8 +13,10 @@ class OnBoard(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         self.__position = position
         self.image = raw_image
-        self.image = pygame.transform.scale(self.image,
-                                            (15, 15))  # Image and Rect required for the draw function on sprites
+        # images from the asset cache are already 15x15 and can be shared.
+        if self.image.get_size() != (15, 15):
+            self.image = pygame.transform.scale(self.image,
+                                                (15, 15))  # Image and Rect required for the draw function on sprites
         self.rect = self.image.get_rect()
         self.rect.center = self.__position
 
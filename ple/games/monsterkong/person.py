@@ -1,5 +1,7 @@
 __author__ = 'Batchu Vishal'
 import pygame
+from ..utils import convert_image
+from .tileGrid import spritecollide
 
 '''
 This class defines all living things in the game, ex.Donkey Kong, Player etc
@@ -15,8 +17,8 @@ class Person(pygame.sprite.Sprite):
         self.height = height
         self.__position = position
         self.image = raw_image
-        self.image = pygame.transform.scale(
-            self.image, (width, height)).convert_alpha()
+        self.image = convert_image(pygame.transform.scale(
+            self.image, (width, height)), alpha=True)
         self.rect = self.image.get_rect()
         self.rect.center = self.__position
 
@@ -57,10 +59,10 @@ class Person(pygame.sprite.Sprite):
         self.__position = (self.__position[0], self.__position[1] + value)
         self.rect.center = self.__position
 
-    # Given a collider list, just check if the person instance collides with
-    # any of them
-    def checkCollision(self, colliderGroup):
-        Colliders = pygame.sprite.spritecollide(self, colliderGroup, False)
+    # Given a collider group or tile grid, just check if the person instance
+    # collides with any of them, after moving it vertically by dy if given
+    def checkCollision(self, colliderGroup, dy=0):
+        Colliders = spritecollide(self, colliderGroup, dy=dy)
         return Colliders
 
     # This is another abstract function, and it must be implemented in child
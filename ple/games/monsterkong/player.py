@@ -34,11 +34,9 @@ class Player(Person):
 
             # If the player is not jumping
             if self.isJumping == 0:
-                # We move down a little and check if we collide with anything
-                self.updateY(2)
-                laddersCollided = self.checkCollision(ladderGroupList)
-                wallsCollided = self.checkCollision(wallGroupList)
-                self.updateY(-2)
+                # We check if we would collide with anything a little lower
+                laddersCollided = self.checkCollision(ladderGroupList, 2)
+                wallsCollided = self.checkCollision(wallGroupList, 2)
                 # If we are not colliding with anything below, then we start a
                 # jump with 0 speed so that we just fall down
                 if len(wallsCollided) == 0 and len(laddersCollided) == 0:
@@ -0,0 +1,53 @@
+'''
+This class is a spatial index over the static tiles of the board, its walls or ladders.
+Every tile is filed under the grid cells its rect covers, so a collision query only tests the
+few tiles near the rect instead of every tile on the board.
+'''
+
+
+class TileGrid(object):
+
+    def __init__(self, tiles, tileSize=15):
+        self.tileSize = tileSize
+        self.tiles = list(tiles)
+        self.__cells = {}
+        for index, tile in enumerate(self.tiles):
+            for cell in self.__cellsCovered(tile.rect):
+                self.__cells.setdefault(cell, []).append(index)
+
+    def __cellsCovered(self, rect):
+        size = self.tileSize
+        for x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (x, y)
+
+    # Returns the tiles that collide with the rect, in the order they were
+    # given, the same as pygame.sprite.spritecollide
+    def collide(self, rect):
+        cells = self.__cells
+        indices = set()
+        for cell in self.__cellsCovered(rect):
+            indices.update(cells.get(cell, ()))
+
+        tiles = self.tiles
+        return [tiles[i] for i in sorted(indices)
+                if rect.colliderect(tiles[i].rect)]
+
+    def __len__(self):
+        return len(self.tiles)
+
+
+# Gets the sprites in the group or tile grid that collide with the sprite
+# after moving it by (dx, dy). The sprite itself is never moved.
+def spritecollide(sprite, group, dx=0, dy=0):
+    rect = sprite.rect
+    if dx or dy:
+        # placed the way the sprite would place itself at the new position
+        position = sprite.getPosition()
+        rect = rect.copy()
+        rect.center = (position[0] + dx, position[1] + dy)
+
+    if isinstance(group, TileGrid):
+        return group.collide(rect)
+
+    return [s for s in group.sprites() if rect.colliderect(s.rect)]
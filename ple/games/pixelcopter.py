@@ -1,5 +1,4 @@
 import math
-import sys
 
 #import .base
 from .base.pygamewrapper import PyGameWrapper
@@ -147,15 +146,9 @@ class Pixelcopter(PyGameWrapper):
     def _handle_player_events(self):
         self.is_climbing = False
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                key = event.key
-                if key == self.actions['up']:
-                    self.is_climbing = True
+        for key in self._get_keys():
+            if key == self.actions['up']:
+                self.is_climbing = True
 
     def getGameState(self):
         """
@@ -177,16 +170,7 @@ class Pixelcopter(PyGameWrapper):
 
         """
 
-        min_dist = 999
-        min_block = None
-        for b in self.block_group:  # Groups do not return in order
-            dist_to = b.pos.x - self.player.pos.x
-            if dist_to > 0 and dist_to < min_dist:
-                min_block = b
-                min_dist = dist_to
-
-        current_terrain = pygame.sprite.spritecollide(
-            self.player, self.terrain_group, False)[0]
+        min_dist, min_block, current_terrain = self._state_objects()
         state = {
             "player_y": self.player.pos.y,
             "player_vel": self.player.momentum,
@@ -199,6 +183,39 @@ class Pixelcopter(PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        return ("player_y", "player_vel", "player_dist_to_ceil",
+                "player_dist_to_floor", "next_gate_dist_to_player",
+                "next_gate_block_top", "next_gate_block_bottom")
+
+    def getGameStateVector(self, out=None):
+        out = self._state_vector(out)
+        min_dist, min_block, current_terrain = self._state_objects()
+
+        out[0] = self.player.pos.y
+        out[1] = self.player.momentum
+        out[2] = self.player.pos.y - (current_terrain.pos.y - self.height * 0.25)
+        out[3] = (current_terrain.pos.y + self.height * 0.25) - self.player.pos.y
+        out[4] = min_dist
+        out[5] = min_block.pos.y
+        out[6] = min_block.pos.y + min_block.height
+
+        return out
+
+    def _state_objects(self):
+        min_dist = 999
+        min_block = None
+        for b in self.block_group:  # Groups do not return in order
+            dist_to = b.pos.x - self.player.pos.x
+            if dist_to > 0 and dist_to < min_dist:
+                min_block = b
+                min_dist = dist_to
+
+        current_terrain = pygame.sprite.spritecollide(
+            self.player, self.terrain_group, False)[0]
+
+        return min_dist, min_block, current_terrain
+
     def getScreenDims(self):
         return self.screen_dim
 
@@ -273,7 +290,6 @@ class Pixelcopter(PyGameWrapper):
 
     def step(self, dt):
 
-        self.screen.fill((0, 0, 0))
         self._handle_player_events()
 
         self.score += self.rewards["tick"]
@@ -322,6 +338,8 @@ class Pixelcopter(PyGameWrapper):
         if self.lives <= 0.0:
             self.score += self.rewards["loss"]
 
+    def render(self):
+        self.screen.fill((0, 0, 0))
         self.player_group.draw(self.screen)
         self.block_group.draw(self.screen)
         self.terrain_group.draw(self.screen)
@@ -341,4 +359,5 @@ if __name__ == "__main__":
             game.reset()
         dt = game.clock.tick_busy_loop(30)
         game.step(dt)
+        game.render()
         pygame.display.update()
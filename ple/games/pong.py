@@ -241,18 +241,12 @@ class Pong(PyGameWrapper):
             pygame.event.pump()
         else:
             # consume events from act
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+            for key in self._get_keys():
+                if key == self.actions['up']:
+                    self.dy = -self.agentPlayer.speed
 
-                if event.type == pygame.KEYDOWN:
-                    key = event.key
-                    if key == self.actions['up']:
-                        self.dy = -self.agentPlayer.speed
-
-                    if key == self.actions['down']:
-                        self.dy = self.agentPlayer.speed
+                if key == self.actions['down']:
+                    self.dy = self.agentPlayer.speed
 
 
 
@@ -287,6 +281,22 @@ class Pong(PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        return ("player_y", "player_velocity", "cpu_y", "ball_x", "ball_y",
+                "ball_velocity_x", "ball_velocity_y")
+
+    def getGameStateVector(self, out=None):
+        out = self._state_vector(out)
+        out[0] = self.agentPlayer.pos.y
+        out[1] = self.agentPlayer.vel.y
+        out[2] = self.cpuPlayer.pos.y
+        out[3] = self.ball.pos.x
+        out[4] = self.ball.pos.y
+        out[5] = self.ball.vel.x
+        out[6] = self.ball.vel.y
+
+        return out
+
     def getScore(self):
         return self.score_sum
 
@@ -351,7 +361,6 @@ class Pong(PyGameWrapper):
 
     def step(self, dt):
         dt /= 1000.0
-        self.screen.fill((0, 0, 0))
 
         self.agentPlayer.speed = self.players_speed_ratio * self.height
         self.cpuPlayer.speed = self.cpu_speed_ratio * self.height
@@ -391,6 +400,8 @@ class Pong(PyGameWrapper):
             self.agentPlayer.update(self.dy, dt)
             self.cpuPlayer.updateCpu(self.ball, dt)
 
+    def render(self):
+        self.screen.fill((0, 0, 0))
         self.players_group.draw(self.screen)
         self.ball_group.draw(self.screen)
 
@@ -407,4 +418,5 @@ if __name__ == "__main__":
     while True:
         dt = game.clock.tick_busy_loop(60)
         game.step(dt)
+        game.render()
         pygame.display.update()
@@ -1,6 +1,7 @@
 import pygame
 import math
 from .utils.vec2d import vec2d
+from .utils import convert_image
 
 
 class Creep(pygame.sprite.Sprite):
@@ -43,7 +44,7 @@ class Creep(pygame.sprite.Sprite):
             0
         )
 
-        self.image = image.convert()
+        self.image = convert_image(image)
         self.rect = self.image.get_rect()
         self.rect.center = pos_init
 
@@ -90,7 +91,7 @@ class Wall(pygame.sprite.Sprite):
 
         image = pygame.Surface([w, h])
         image.fill((10, 10, 10))
-        self.image = image.convert()
+        self.image = convert_image(image)
 
         self.rect = self.image.get_rect()
         self.rect.center = pos
@@ -130,7 +131,7 @@ class Player(pygame.sprite.Sprite):
             0
         )
 
-        self.image = image.convert()
+        self.image = convert_image(image)
         self.rect = self.image.get_rect()
         self.radius = radius
 
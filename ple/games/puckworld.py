@@ -1,5 +1,4 @@
 import pygame
-import sys
 import math
 
 #import .base
@@ -112,25 +111,18 @@ class PuckWorld(PyGameWrapper):
     def _handle_player_events(self):
         self.dx = 0.0
         self.dy = 0.0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        for key in self._get_keys():
+            if key == self.actions["left"]:
+                self.dx -= self.AGENT_SPEED
 
-            if event.type == pygame.KEYDOWN:
-                key = event.key
+            if key == self.actions["right"]:
+                self.dx += self.AGENT_SPEED
 
-                if key == self.actions["left"]:
-                    self.dx -= self.AGENT_SPEED
+            if key == self.actions["up"]:
+                self.dy -= self.AGENT_SPEED
 
-                if key == self.actions["right"]:
-                    self.dx += self.AGENT_SPEED
-
-                if key == self.actions["up"]:
-                    self.dy -= self.AGENT_SPEED
-
-                if key == self.actions["down"]:
-                    self.dy += self.AGENT_SPEED
+            if key == self.actions["down"]:
+                self.dy += self.AGENT_SPEED
 
     def getGameState(self):
         """
@@ -165,6 +157,24 @@ class PuckWorld(PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        return ("player_x", "player_y", "player_velocity_x",
+                "player_velocity_y", "good_creep_x", "good_creep_y",
+                "bad_creep_x", "bad_creep_y")
+
+    def getGameStateVector(self, out=None):
+        out = self._state_vector(out)
+        out[0] = self.player.pos.x
+        out[1] = self.player.pos.y
+        out[2] = self.player.vel.x
+        out[3] = self.player.vel.y
+        out[4] = self.good_creep.pos.x
+        out[5] = self.good_creep.pos.y
+        out[6] = self.bad_creep.pos.x
+        out[7] = self.bad_creep.pos.y
+
+        return out
+
     def getScore(self):
         return self.score
 
@@ -227,7 +237,6 @@ class PuckWorld(PyGameWrapper):
         """
         dt /= 1000.0
         self.ticks += 1
-        self.screen.fill(self.BG_COLOR)
 
         self.score += self.rewards["tick"]
 
@@ -261,6 +270,8 @@ class PuckWorld(PyGameWrapper):
         self.bad_creep.update(ndx, ndy, dt)
         self.good_creep.update(dt)
 
+    def render(self):
+        self.screen.fill(self.BG_COLOR)
         self.player.draw(self.screen)
         self.creeps.draw(self.screen)
 
@@ -278,4 +289,5 @@ if __name__ == "__main__":
     while True:
         dt = game.clock.tick_busy_loop(60)
         game.step(dt)
+        game.render()
         pygame.display.update()
@@ -39,201 +39,446 @@ class RayCastPlayer():
         self.eps = 1e-7
 
         self.block_types = block_types
+        self.shade_table = shade_table(block_types)
 
-    def _handle_player_events(self, dt):
-        dt = dt / 1000.0
+        self._movement = None  # see setMovement.
+        self._turn_angle = None  # the angle the cached rotation is for.
+
+    def _get_keys(self):
+        # games built on this player get their keys from PyGameWrapper.
+        keys = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
             if event.type == pygame.KEYDOWN:
-                key = event.key
+                keys.append(event.key)
 
-                new_location = self.pos
+        return keys
 
-                if key == self.actions["forward"]:
-                    new_location = self.pos + self.dir * self.move_speed * dt
+    def setMovement(self, forward, turn):
+        """
+        Sets a continuous action, used in place of the keys pressed, eg.
+        ``game.setMovement(0.5, -1.0)`` before ``p.act(p.NOOP)``. It is
+        applied on every step, including skipped frames, until it is
+        replaced or PLE is given a key action.
 
-                if key == self.actions["backward"]:
-                    new_location = self.pos - self.dir * self.move_speed * dt
+        Parameters
+        ----------
+        forward : float
+            Between -1 and 1, the fraction of move_speed to move forward.
+            Negative moves backward.
 
-                new_location = new_location.astype(int)
+        turn : float
+            Between -1 and 1, the fraction of turn_speed to turn right.
+            Negative turns left.
+        """
+        self._movement = (forward, turn)
 
-                newX, newY = new_location[0, :]
+    def _handle_player_events(self, dt):
+        keys = self._get_keys()
 
-                if newX < self.map_.shape[0] and newY < self.map_.shape[1]:
-                    new_map = self.map_[newX, newY]
+        movement = self._movement
+        if movement is not None:
+            self.move(movement[0], movement[1], dt)
+            return
 
-                    if self.block_types[new_map]["pass_through"]:
+        forward, turn = self._keys_to_movement(keys)
+        if forward or turn:
+            self.move(forward, turn, dt)
 
-                        if key == self.actions["forward"]:
-                            self.pos[0, 0] += self.dir[0, 0] * \
-                                self.move_speed * dt
-                            self.pos[0, 1] += self.dir[0, 1] * \
-                                self.move_speed * dt
+    def _keys_to_movement(self, keys):
+        # keys pressed together are applied in the same step.
+        forward = (self.actions["forward"] in keys) - \
+            (self.actions["backward"] in keys)
+        turn = (self.actions["right"] in keys) - (self.actions["left"] in keys)
 
-                        if key == self.actions["backward"]:
-                            self.pos[0, 0] -= self.dir[0, 0] * \
-                                self.move_speed * dt
-                            self.pos[0, 1] -= self.dir[0, 1] * \
-                                self.move_speed * dt
+        return forward, turn
 
-                if key == self.actions["right"]:
-                    X_TURN = np.cos(self.turn_speed * dt)
-                    Y_TURN = np.sin(self.turn_speed * dt)
+    def move(self, forward, turn, dt):
+        """
+        Moves the player then turns it.
 
-                    _dirX = self.dir[0, 0] * X_TURN - self.dir[0, 1] * Y_TURN
-                    _dirY = self.dir[0, 0] * Y_TURN + self.dir[0, 1] * X_TURN
+        Parameters
+        ----------
+        forward : float
+            The fraction of move_speed to move forward, negative is backward.
+            The move is skipped if it would end inside a solid block.
 
-                    _planeX = self.plane[0, 0] * \
-                        X_TURN - self.plane[0, 1] * Y_TURN
-                    _planeY = self.plane[0, 0] * \
-                        Y_TURN + self.plane[0, 1] * X_TURN
+        turn : float
+            The fraction of turn_speed to turn right, negative is left.
 
-                    self.dir[0, 0] = _dirX
-                    self.dir[0, 1] = _dirY
+        dt : float
+            The time elapsed in milliseconds.
+        """
+        dt = dt / 1000.0
+        pos = self.pos[0]
+        dir_ = self.dir[0]
+
+        if forward:
+            newX = pos[0] + dir_[0] * self.move_speed * dt * forward
+            newY = pos[1] + dir_[1] * self.move_speed * dt * forward
+
+            # truncated like the old astype(int).
+            cellX, cellY = int(newX), int(newY)
+            if cellX < self.map_.shape[0] and cellY < self.map_.shape[1]:
+                new_map = self.map_[cellX, cellY]
+
+                if self.block_types[new_map]["pass_through"]:
+                    pos[0] = newX
+                    pos[1] = newY
+
+        if turn:
+            # dt is usually fixed, so the rotation is kept for the next turn.
+            angle = abs(self.turn_speed * dt * turn)
+            if angle != self._turn_angle:
+                self._turn_angle = angle
+                self._turn_cos = np.cos(angle)
+                self._turn_sin = np.sin(angle)
+
+            c = self._turn_cos
+            s = self._turn_sin if turn > 0 else -self._turn_sin
+
+            for v in (dir_, self.plane[0]):
+                x, y = v[0], v[1]
+                v[0] = x * c - y * s
+                v[1] = x * s + y * c
 
-                    self.plane[0, 0] = _planeX
-                    self.plane[0, 1] = _planeY
+    def draw(self):
+        """
+        Casts a ray for every screen column, see :func:`cast_rays`.
 
-                if key == self.actions["left"]:
-                    X_INV_TURN = np.cos(-self.turn_speed * dt)
-                    Y_INV_TURN = np.sin(-self.turn_speed * dt)
+        Returns
+        -------
+        list of numpy int arrays
+            The x position, top, bottom and color of each column.
+        """
+        columns, tops, bottoms, colors = cast_rays(
+            self.pos, self.dir, self.plane, self.map_[np.newaxis],
+            self.width, self.height, self.resolution,
+            self.shade_table, eps=self.eps)
 
-                    _dirX = self.dir[0, 0] * X_INV_TURN - \
-                        self.dir[0, 1] * Y_INV_TURN
-                    _dirY = self.dir[0, 0] * Y_INV_TURN + \
-                        self.dir[0, 1] * X_INV_TURN
+        return [columns, tops[0], bottoms[0], colors[0]]
 
-                    _planeX = self.plane[0, 0] * X_INV_TURN - \
-                        self.plane[0, 1] * Y_INV_TURN
-                    _planeY = self.plane[0, 0] * Y_INV_TURN + \
-                        self.plane[0, 1] * X_INV_TURN
+    def _DDA(self, side_dist, delta_dist, map_, step):
+        env = np.zeros(map_.shape[0], dtype=int)
+        return _DDA(self.map_[np.newaxis], env,
+                    side_dist, delta_dist, map_, step)
 
-                    self.dir[0, 0] = _dirX
-                    self.dir[0, 1] = _dirY
 
-                    self.plane[0, 0] = _planeX
-                    self.plane[0, 1] = _planeY
+def block_colors(block_types):
+    """
+    Turns a block_types dict into a color table indexed by block type.
+    Blocks without a color are drawn white.
 
+    Returns
+    -------
+    numpy float array
+        Shape (max block type + 1, 3).
+    """
+    table = np.ones((max(block_types.keys()) + 1, 3)) * 255.0
+    for k, block in block_types.items():
+        if block is not None and block["color"] is not None:
+            table[k] = block["color"]
 
-    def draw(self):
-        #N = width/resolution
-        # N,2
-        cameraX = np.arange(
-            0.0,
-            self.width,
-            self.resolution).astype(
-            np.float32)[
-            :,
-            np.newaxis]
-        cameraX = 2.0 * cameraX / float(self.width) - 1.0
+    return table
 
-        # set the rayPos to the players current position
-        ray_pos = np.tile(self.pos, [cameraX.shape[0], 1])  # N,2
 
-        # ray direction
-        ray_dir = self.dir + self.plane * cameraX  # N,2
+def shade_table(block_types, side_light=0.65, falloff=22.5):
+    """
+    Precomputes the color of every block type, wall side and distance
+    shade so :func:`cast_rays` colors a column with a single lookup.
 
-        # which box of the map we're in
-        map_ = ray_pos.astype(int)
+    Walls darken by `falloff` levels per unit of distance and walls facing
+    along y are dimmed to `side_light`.
 
-        ray_pow = np.power(ray_dir, 2.0) + self.eps
-        ray_div = ray_pow[:, 0] / (ray_pow[:, 1])
-        delta_dist = np.sqrt(
-            1.0 + np.array([1.0 / (ray_div), ray_div])).T  # N,2
+    Returns
+    -------
+    numpy uint8 array
+        Shape (block types, 2, 256, 3), indexed by block type, side (0 for
+        x, 1 for y) and shade level.
+    """
+    colors = block_colors(block_types)
+    shade = np.arange(256, dtype=float)[:, np.newaxis]
 
-        # N,2
-        step = np.ones(ray_dir.shape).astype(int)
-        step[ray_dir[:, 0] < 0, 0] = -1
-        step[ray_dir[:, 1] < 0, 1] = -1
+    table = np.empty((colors.shape[0], 2, 256, 3), dtype=np.uint8)
+    for k in range(colors.shape[0]):
+        lit = np.clip(colors[k] - shade, 0, 255)
+        table[k, 0] = lit.astype(int)
+        table[k, 1] = (lit * side_light).astype(int)
 
-        # N,2
-        side_dist = (map_ + 1.0 - ray_pos) * delta_dist
-        _value = (ray_pos - map_) * delta_dist
+    return table
 
-        side_dist[ray_dir[:, 0] < 0, 0] = _value[ray_dir[:, 0] < 0, 0]
-        side_dist[ray_dir[:, 1] < 0, 1] = _value[ray_dir[:, 1] < 0, 1]
 
-        side_dist, delta_dist, map_, side = self._DDA(
-            side_dist, delta_dist, map_, step)
+def stack_maps(maps):
+    """
+    Stacks grids of different sizes into one array for :func:`cast_rays`,
+    padding the smaller ones with walls.
+
+    Parameters
+    ----------
+    maps : list of numpy int arrays
+        The map_ grid of each env.
+
+    Returns
+    -------
+    numpy int array
+        Shape (len(maps), max rows, max columns).
+    """
+    rows = max(m.shape[0] for m in maps)
+    cols = max(m.shape[1] for m in maps)
+    stacked = np.ones((len(maps), rows, cols), dtype=int)
+    for i, m in enumerate(maps):
+        stacked[i, :m.shape[0], :m.shape[1]] = m
 
-        perpWallDistX = (map_[:, 0] - ray_pos[:, 0] + (1.0 - step[:, 0]) / 2.0)
-        perpWallDistX = perpWallDistX / (ray_dir[:, 0] + self.eps)
-        perpWallDistX = perpWallDistX[:, np.newaxis]
+    return stacked
 
-        perpWallDistY = (map_[:, 1] - ray_pos[:, 1] + (1.0 - step[:, 1]) / 2.0)
-        perpWallDistY = perpWallDistY / (ray_dir[:, 1] + self.eps)
-        perpWallDistY = perpWallDistY[:, np.newaxis]
 
-        perpWallDist = perpWallDistY
-        perpWallDist[side == 0] = perpWallDistX[side == 0]
+def _trace(pos, dir_, plane, maps, width, resolution, eps):
+    # casts the rays of every column for each player, returning the
+    # perpendicular distance, side and grid cell of each hit along with the
+    # player each ray belongs to.
+    batch = pos.shape[0]
 
-        lineHeights = (self.height / (perpWallDist + self.eps)).astype(int)
+    # N,1
+    cameraX = np.arange(0.0, width, resolution).astype(np.float32)[:, np.newaxis]
+    cameraX = 2.0 * cameraX / float(width) - 1.0
+    n = cameraX.shape[0]
 
-        tops = -(lineHeights) / 2.0 + self.height / 2.0
-        tops[tops < 0] = 0.0
-        tops = tops.astype(int)
+    # B*N,2 with the rays of each player next to each other.
+    ray_pos = np.repeat(pos, n, axis=0)
+    ray_dir = (dir_[:, np.newaxis] + plane[:, np.newaxis] *
+               cameraX[np.newaxis]).reshape(batch * n, 2)
+    env = np.repeat(np.arange(batch), n)
 
-        bottoms = lineHeights / 2.0 + self.height / 2.0
-        bottoms[bottoms >= self.height] = self.height - 1
-        bottoms = bottoms.astype(int)
+    # which box of the map we're in
+    map_ = ray_pos.astype(int)
 
-        visible_blocks = self.map_[map_[:, 0], map_[:, 1]]
-        coloring = np.ones((bottoms.shape[0], 3)) * 255.0
+    ray_pow = np.power(ray_dir, 2.0) + eps
+    ray_div = ray_pow[:, 0] / (ray_pow[:, 1])
+    delta_dist = np.sqrt(
+        1.0 + np.array([1.0 / (ray_div), ray_div])).T  # B*N,2
 
-        for k in self.block_types.keys():
-            if self.block_types[k] is not None:
-                c = self.block_types[k]["color"]
-                sel = visible_blocks == k
-                coloring[sel] = np.tile(c, [bottoms.shape[0], 1])[sel]
+    step = np.ones(ray_dir.shape).astype(int)
+    step[ray_dir[:, 0] < 0, 0] = -1
+    step[ray_dir[:, 1] < 0, 1] = -1
 
-        shading = np.abs(perpWallDist * 15) * 1.5
-        coloring = coloring - shading
-        coloring = np.clip(coloring, 0, 255)
-        coloring[(side == 1.0).flatten(), :] *= 0.65  # lighting apparently
+    side_dist = (map_ + 1.0 - ray_pos) * delta_dist
+    _value = (ray_pos - map_) * delta_dist
 
-        cameraX = np.arange(0, self.width, self.resolution)
-        returns = [cameraX, tops, bottoms, coloring]
+    side_dist[ray_dir[:, 0] < 0, 0] = _value[ray_dir[:, 0] < 0, 0]
+    side_dist[ray_dir[:, 1] < 0, 1] = _value[ray_dir[:, 1] < 0, 1]
 
-        return [r.astype(int) for r in returns]
+    side_dist, delta_dist, map_, side = _DDA(
+        maps, env, side_dist, delta_dist, map_, step)
 
-    def _DDA(self, side_dist, delta_dist, map_, step):
-        # tested against for-loop version using line_profiler
-        # for-loop take about 0.005968s per call
-        # this version takes 0.000416s per call
-        hits = np.zeros((map_.shape[0], 1))
-        side = np.zeros((map_.shape[0], 1))
-
-        while np.sum(hits) < side_dist.shape[0]:
-            # only update values that havent hit a wall. So are 0 still.
-
-            update_mask = np.logical_not(hits).astype(np.bool)
-
-            # 1 => 1, 0
-            # 0 => 0, 1
-            mask = (side_dist[:, 0] < side_dist[:, 1])[:, np.newaxis]
-
-            sel = (update_mask & (mask == True)).flatten()
-            side_dist[sel, 0] += delta_dist[sel, 0]
-            map_[sel, 0] += step[sel, 0]
-            side[sel] = np.zeros(side.shape)[sel]
-
-            sel = (update_mask & (mask == False)).flatten()
-            side_dist[sel, 1] += delta_dist[sel, 1]
-            map_[sel, 1] += step[sel, 1]
-            side[sel] = np.ones(side.shape)[sel]
-
-            # once it becomes 1 it never goes back to 0.
-            hits = np.logical_or(
-                hits, (self.map_[
-                    map_[
-                        :, 0], map_[
-                        :, 1]] > 0)[
-                    :, np.newaxis])
-
-        return side_dist, delta_dist, map_, side
+    perpWallDistX = (map_[:, 0] - ray_pos[:, 0] + (1.0 - step[:, 0]) / 2.0)
+    perpWallDistX = perpWallDistX / (ray_dir[:, 0] + eps)
+    perpWallDistX = perpWallDistX[:, np.newaxis]
+
+    perpWallDistY = (map_[:, 1] - ray_pos[:, 1] + (1.0 - step[:, 1]) / 2.0)
+    perpWallDistY = perpWallDistY / (ray_dir[:, 1] + eps)
+    perpWallDistY = perpWallDistY[:, np.newaxis]
+
+    perpWallDist = perpWallDistY
+    perpWallDist[side == 0] = perpWallDistX[side == 0]
+
+    return perpWallDist, side, map_, env
+
+
+def ray_distances(pos, dir_, plane, maps, n_rays, eps=1e-7):
+    """
+    Casts n_rays rays evenly across the view of each player, without
+    computing anything needed for drawing.
+
+    Parameters
+    ----------
+    pos, dir_, plane, maps
+        See :func:`cast_rays`.
+
+    n_rays : int
+        The number of rays per player, from the left edge of the view.
+
+    Returns
+    -------
+    numpy float array
+        Shape (B, n_rays). The perpendicular distance to the wall each ray
+        hits, the distance the walls are drawn at.
+    """
+    perpWallDist = _trace(pos, dir_, plane, maps, n_rays, 1, eps)[0]
+    return perpWallDist.reshape(pos.shape[0], n_rays)
+
+
+def cast_rays(pos, dir_, plane, maps, width, height, resolution,
+              colors, eps=1e-7):
+    """
+    Casts every screen column's ray for a batch of players at once.
+
+    Parameters
+    ----------
+    pos, dir_, plane : numpy float32 arrays
+        Shape (B, 2). The position, view direction and camera plane of
+        each player.
+
+    maps : numpy int array
+        Shape (B, rows, columns). The grid each player is in, see
+        :func:`stack_maps`. Every ray must end in a wall.
+
+    width, height, resolution : int
+        The screen size and the width of each column in pixels.
+
+    colors : numpy uint8 array
+        The shaded colors of each block type, see :func:`shade_table`.
+
+    Returns
+    -------
+    tuple of numpy int arrays
+        The x position of each column, shape (N,), and per player the
+        column tops and bottoms, shape (B, N), and uint8 colors, shape
+        (B, N, 3).
+    """
+    batch = pos.shape[0]
+    perpWallDist, side, map_, env = _trace(
+        pos, dir_, plane, maps, width, resolution, eps)
+    n = perpWallDist.shape[0] // batch
+
+    lineHeights = (height / (perpWallDist + eps)).astype(int)
+
+    tops = -(lineHeights) / 2.0 + height / 2.0
+    tops[tops < 0] = 0.0
+    tops = tops.astype(int)
+
+    bottoms = lineHeights / 2.0 + height / 2.0
+    bottoms[bottoms >= height] = height - 1
+    bottoms = bottoms.astype(int)
+
+    visible_blocks = maps[env, map_[:, 0], map_[:, 1]]
+
+    # 22.5 shade levels per unit of distance, see shade_table. Rounding up
+    # matches truncating the shaded color.
+    shade = np.ceil(np.abs(perpWallDist[:, 0]) * 22.5)
+    shade = np.minimum(shade, 255).astype(int)
+    coloring = colors[visible_blocks, side[:, 0].astype(int), shade]
+
+    columns = np.arange(0, width, resolution)
+
+    return (columns.astype(int), tops.reshape(batch, n),
+            bottoms.reshape(batch, n), coloring.reshape(batch, n, 3))
+
+
+def make_background(width, height, ceiling=(0, 0, 0), floor=(92, 92, 92)):
+    """
+    Builds the frame the walls are drawn over, the ceiling on the top half
+    and the floor on the bottom.
+
+    Returns
+    -------
+    numpy uint8 array
+        Shape (width, height, 3), the layout of pygame.surfarray.
+    """
+    background = np.empty((width, height, 3), dtype=np.uint8)
+    background[:, :height // 2] = ceiling
+    background[:, height // 2:] = floor
+
+    return background
+
+
+def rasterize(columns, tops, bottoms, colors, resolution, background, out):
+    """
+    Draws the wall columns returned by :func:`cast_rays` for one player into
+    a pixel array. Matches drawing each column as a vertical pygame line of
+    width resolution over the background.
+
+    Parameters
+    ----------
+    columns, tops, bottoms : numpy int arrays
+        Shape (N,). The x position and the first and last row of each column.
+
+    colors : numpy int array
+        Shape (N, 3).
+
+    resolution : int
+        The width of each column in pixels.
+
+    background : numpy uint8 array
+        Shape (width, height, 3), see :func:`make_background`.
+
+    out : numpy uint8 array
+        Shape (width, height, 3). The frame is written here.
+
+    Returns
+    -------
+    numpy uint8 array
+        out
+    """
+    width, height = background.shape[:2]
+
+    # a line of width w at x covers x - (w - 1) // 2 onwards, find the
+    # column that covers each pixel x.
+    x = np.arange(width) + (resolution - 1) // 2
+    column = x // resolution
+    valid = column < columns.shape[0]
+    column = np.minimum(column, columns.shape[0] - 1)
+
+    y = np.arange(height)
+    wall = ((y >= tops[column, np.newaxis]) &
+            (y <= bottoms[column, np.newaxis]) & valid[:, np.newaxis])
+
+    np.copyto(out, background)
+    np.copyto(out, colors[column, np.newaxis], casting="unsafe",
+              where=wall[:, :, np.newaxis])
+
+    return out
+
+
+def _DDA(maps, env, side_dist, delta_dist, map_, step):
+    # walks every ray one grid line at a time until it enters a wall of its
+    # env's map. Only the rays still travelling are kept in the working
+    # arrays, a ray is written back and dropped as soon as it hits, so each
+    # pass costs the number of active rays rather than all of them.
+    side = np.zeros((map_.shape[0], 1))
+
+    active = np.arange(map_.shape[0])
+    env = env.copy()
+    side_x = side_dist[:, 0].copy()
+    side_y = side_dist[:, 1].copy()
+    delta_x = delta_dist[:, 0].copy()
+    delta_y = delta_dist[:, 1].copy()
+    map_x = map_[:, 0].copy()
+    map_y = map_[:, 1].copy()
+    step_x = step[:, 0].copy()
+    step_y = step[:, 1].copy()
+
+    while active.size:
+        # step along x where the next x line is closer, else along y.
+        on_x = side_x < side_y
+        on_y = ~on_x
+
+        side_x += np.where(on_x, delta_x, 0.0)
+        map_x += np.where(on_x, step_x, 0)
+        side_y += np.where(on_y, delta_y, 0.0)
+        map_y += np.where(on_y, step_y, 0)
+
+        hit = maps[env, map_x, map_y] > 0
+        if not hit.any():
+            continue
+
+        done = active[hit]
+        side_dist[done, 0] = side_x[hit]
+        side_dist[done, 1] = side_y[hit]
+        map_[done, 0] = map_x[hit]
+        map_[done, 1] = map_y[hit]
+        side[done, 0] = on_y[hit]
+
+        keep = ~hit
+        active, env = active[keep], env[keep]
+        side_x, side_y = side_x[keep], side_y[keep]
+        delta_x, delta_y = delta_x[keep], delta_y[keep]
+        map_x, map_y = map_x[keep], map_y[keep]
+        step_x, step_y = step_x[keep], step_y[keep]
+
+    return side_dist, delta_dist, map_, side
 
 
 def make_map(dim):
@@ -0,0 +1,336 @@
+import math
+
+import pygame
+import numpy as np
+from pygame.constants import K_w, K_a, K_d, K_s
+
+from .base.pygamewrapper import PyGameWrapper
+from .raycast import RayCastPlayer, cast_rays, make_background, rasterize
+from .raycastmaze import make_maze, open_distances, target_candidates
+
+
+class RaycastArena(PyGameWrapper):
+    """
+    Several agents race through the same maze to reach the red block first.
+    Every agent has its own first person view and the views of all of them
+    are cast together in one batched pass, see :func:`ple.games.raycast.cast_rays`.
+    Agents do not see or block each other.
+
+    Through :class:`ple.PLE` the actions and reward are those of agent 0.
+    To control every agent set their actions with :func:`setActions`, then
+    step with a NOOP and read :func:`getRewards` and :func:`getScreensRGB`:
+
+    >>> game.setActions([K_w, K_a, (K_w, K_d), None])
+    >>> p.act(p.NOOP)
+    >>> rewards = game.getRewards()
+    >>> frames = game.getScreensRGB()
+
+    Parameters
+    ----------
+    num_agents : int (default: 2)
+        The number of agents in the maze.
+
+    resolution : int (default: 1)
+        The width of each column drawn, see :class:`RaycastMaze`.
+
+    move_speed : int (default: 20)
+        How fast the agents move forwards or backwards.
+
+    turn_speed : int (default: 13)
+        The speed at which the agents turn left or right.
+
+    map_size : int (default: 10)
+        The size of the maze that is generated. Must be greater then 5.
+
+    width : int (default: 48)
+        Screen width of each agent's view.
+
+    height : int (default: 48)
+        Screen height of each agent's view.
+
+    """
+
+    def __init__(self, num_agents=2, resolution=1,
+                 move_speed=20, turn_speed=13,
+                 map_size=10, height=48, width=48):
+
+        assert map_size > 5, "map_size must be gte 5"
+        assert num_agents > 0, "num_agents must be at least 1"
+
+        block_types = {
+            0: {
+                "pass_through": True,
+                "color": None
+            },
+            1: {
+                "pass_through": False,
+                "color": (255, 255, 255)
+            },
+            2: {
+                "pass_through": False,
+                "color": (255, 100, 100)
+            }
+        }
+        actions = {
+            "forward": K_w,
+            "left": K_a,
+            "right": K_d,
+            "backward": K_s
+        }
+
+        PyGameWrapper.__init__(self, width, height, actions=actions)
+
+        self.num_agents = num_agents
+        self.map_size = map_size
+        self.resolution = resolution
+        self.eps = 1e-7
+
+        self.pos = np.zeros((num_agents, 2), dtype=np.float32)
+        self.dir = np.zeros((num_agents, 2), dtype=np.float32)
+        self.plane = np.zeros((num_agents, 2), dtype=np.float32)
+
+        # each player moves a row of the batched arrays in place.
+        self.players = []
+        for i in range(num_agents):
+            player = RayCastPlayer(None, (0, 0), (1, 0), width, height,
+                                   resolution, move_speed, turn_speed,
+                                   (0, 0.66), actions, block_types)
+            player.pos = self.pos[i:i + 1]
+            player.dir = self.dir[i:i + 1]
+            player.plane = self.plane[i:i + 1]
+            self.players.append(player)
+
+        self.shade_table = self.players[0].shade_table
+
+        self.map_ = None
+        self.obj_loc = None
+        self.scores = np.zeros(num_agents)
+        self._start_scores = np.zeros(num_agents)  # see getRewards.
+        self.is_game_over = False
+        self._agent_actions = None
+
+        self._frames = np.zeros((num_agents, width, height, 3), dtype=np.uint8)
+        self._background = make_background(width, height)
+        self._stale = True  # the frames are behind the agents.
+
+    def init(self):
+        self.scores[:] = 0.0
+        self._start_scores[:] = 0.0
+        self.score = 0.0
+        self.is_game_over = False
+        self._agent_actions = None
+
+        self.map_ = make_maze(self.rng, self.map_size)
+
+        # every agent starts on its own open cell, all connected to (1, 1).
+        cells = np.argwhere(open_distances(self.map_, (1, 1)) >= 0)
+        if len(cells) < self.num_agents:
+            raise ValueError(
+                "The maze has %d open cells, too few for %d agents to start "
+                "on, use a larger map_size." % (len(cells), self.num_agents))
+        starts = self.rng.choice(len(cells), self.num_agents, replace=False)
+        self.pos[:] = cells[starts] + 0.5
+
+        candidates = target_candidates(
+            self.map_, (1, 1), self.map_.shape[0] * self.map_.shape[1])
+        self.obj_loc = candidates[[self.rng.randint(0, high=len(candidates))]]
+        self.map_[self.obj_loc[0][0], self.obj_loc[0][1]] = 2
+
+        # face along a random axis, the camera plane to the right of it.
+        angles = self.rng.randint(0, 4, size=self.num_agents) * (math.pi / 2.0)
+        self.dir[:, 0] = np.round(np.cos(angles))
+        self.dir[:, 1] = np.round(np.sin(angles))
+        self.plane[:, 0] = -0.66 * self.dir[:, 1]
+        self.plane[:, 1] = 0.66 * self.dir[:, 0]
+
+        for player in self.players:
+            player.map_ = self.map_
+
+        self._stale = True
+
+    def reset(self):
+        self.init()
+
+    def setActions(self, actions):
+        """
+        Sets the action of every agent. They are applied on every step,
+        skipped frames included, until they are set again or PLE is given
+        an action other than NOOP.
+
+        Parameters
+        ----------
+        actions : list
+            One entry per agent, a key from the action set, a tuple of keys
+            pressed together or None to do nothing.
+        """
+        if len(actions) != self.num_agents:
+            raise ValueError("Expected %d actions, got %d." %
+                             (self.num_agents, len(actions)))
+
+        self._agent_actions = list(actions)
+        self._start_scores[:] = self.scores
+
+    def _setAction(self, action, last_action):
+        # a NOOP from PLE keeps the actions given to setActions.
+        if action is not None and action != self.NOOP:
+            self._agent_actions = None
+
+        PyGameWrapper._setAction(self, action, last_action)
+
+    def getScore(self):
+        return self.scores[0]
+
+    def getScores(self):
+        """
+        Gets the score of every agent since the last reset.
+
+        Returns
+        -------
+        numpy float array
+            Shape (num_agents,).
+        """
+        return self.scores.copy()
+
+    def getRewards(self):
+        """
+        Gets the reward of every agent since the actions were last set with
+        :func:`setActions`, or since the reset. When the actions are set
+        before every act() these are the rewards of the last act().
+
+        Returns
+        -------
+        numpy float array
+            Shape (num_agents,).
+        """
+        return self.scores - self._start_scores
+
+    def game_over(self):
+        return self.is_game_over
+
+    def _reached_target(self):
+        to_target = (self.obj_loc + 0.5) - self.pos
+        dist = np.sqrt((to_target**2).sum(axis=1))
+        dir_norm = np.sqrt((self.dir**2).sum(axis=1))
+
+        cos = (to_target * self.dir).sum(axis=1) / (dist * dir_norm + self.eps)
+        angle = np.arccos(np.clip(cos, -1.0, 1.0))
+
+        # close to the target object and in sight, as in RaycastMaze.
+        return (dist < 1.1) & (angle < 0.8)
+
+    def step(self, dt):
+        if self.is_game_over:
+            return
+
+        keys = self._get_keys()
+        if self._agent_actions is None:
+            actions = [tuple(keys)] + [()] * (self.num_agents - 1)
+        else:
+            actions = self._agent_actions
+
+        self.scores += self.rewards["tick"]
+
+        for player, action in zip(self.players, actions):
+            if action is None:
+                continue
+            if not isinstance(action, tuple):
+                action = (action,)
+
+            forward, turn = player._keys_to_movement(action)
+            if forward or turn:
+                player.move(forward, turn, dt)
+
+        reached = self._reached_target()
+        if reached.any():
+            # the first agent to reach the block wins, the rest lose.
+            self.scores += np.where(reached, self.rewards["win"],
+                                    self.rewards["loss"])
+            self.is_game_over = True
+
+        self.score = self.scores[0]
+        self._stale = True
+
+    def render(self):
+        maps = np.broadcast_to(self.map_, (self.num_agents,) + self.map_.shape)
+        columns, tops, bottoms, colors = cast_rays(
+            self.pos, self.dir, self.plane, maps, self.width, self.height,
+            self.resolution, self.shade_table, eps=self.eps)
+
+        for i in range(self.num_agents):
+            rasterize(columns, tops[i], bottoms[i], colors[i],
+                      self.resolution, self._background, self._frames[i])
+
+        self._stale = False
+
+    def _draw_frame(self, draw_screen):
+        if draw_screen and not self.headless:
+            pygame.surfarray.blit_array(self.screen, self._frames[0])
+
+        PyGameWrapper._draw_frame(self, draw_screen)
+
+    def getScreenRGB(self, out=None):
+        """
+        Returns the view of agent 0, see :func:`getScreensRGB`.
+        """
+        if self._stale:
+            self.render()
+
+        if out is None:
+            return self._frames[0].copy()
+
+        np.copyto(out, self._frames[0])
+        return out
+
+    def getScreensRGB(self, out=None):
+        """
+        Returns the current view of every agent, rendering them first if
+        they are behind.
+
+        Parameters
+        ----------
+        out : numpy uint8 array (default: None)
+            If given the views are copied into this array, which must have
+            the shape (num_agents, width, height, 3), and it is returned.
+
+        Returns
+        --------
+        numpy uint8 array
+            Returns a numpy array with the shape (num_agents, width, height, 3).
+
+        """
+        if self._stale:
+            self.render()
+
+        if out is None:
+            return self._frames.copy()
+
+        np.copyto(out, self._frames)
+        return out
+
+if __name__ == "__main__":
+    fps = 60
+    pygame.init()
+
+    game = RaycastArena(
+        num_agents=3,
+        height=256,
+        width=256,
+        map_size=10
+    )
+
+    game.screen = pygame.display.set_mode(game.screen_dim, 0, 32)
+    game.clock = pygame.time.Clock()
+    game.rng = np.random.RandomState(24)
+    game.init()
+
+    while True:
+        dt = game.clock.tick_busy_loop(fps)
+
+        if game.game_over():
+            print("Game over! Scores: %s" % game.getScores())
+            print("Resetting!")
+            game.reset()
+
+        game.step(dt)
+        game.render()
+        game._draw_frame(True)
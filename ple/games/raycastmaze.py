@@ -4,9 +4,328 @@ from .base.pygamewrapper import PyGameWrapper
 import pygame
 import numpy as np
 import math
-from .raycast import RayCastPlayer
+import threading
+from .raycast import RayCastPlayer, cast_rays, ray_distances, make_background, rasterize
 from pygame.constants import K_w, K_a, K_d, K_s
 
+try:
+    import queue
+except ImportError:  # python 2
+    import Queue as queue
+
+
+def make_maze(rng, map_size, complexity=0.75, density=0.75):
+    """
+    Generates a random maze with walls set to 1. The size is rounded down to
+    an odd number of cells, map_size // 2 * 2 + 1, with walls on the border.
+
+    Isles are grown as walks on the even cells. A walk that is boxed in by
+    walls can not move again, so its remaining draws are taken in one call,
+    leaving the rng stream and so the maze for a given seed unchanged.
+    """
+    dim = map_size // 2 * 2 + 1
+    half = dim // 2
+
+    complexity = int(complexity * (5 * (dim + dim)))
+    density = int(density * (dim // 2 * dim // 2))
+
+    Z = [[0] * dim for i in range(dim)]
+    Z[0] = [1] * dim
+    Z[-1] = [1] * dim
+    for row in Z:
+        row[0] = row[-1] = 1
+
+    for i in range(density):
+        x = rng.randint(0, half + 1) * 2
+        y = rng.randint(0, half + 1) * 2
+
+        Z[y][x] = 1
+        for j in range(complexity):
+            neighbours = []
+            if x > 1:
+                neighbours.append((y, x - 2))
+            if x < dim - 2:
+                neighbours.append((y, x + 2))
+            if y > 1:
+                neighbours.append((y - 2, x))
+            if y < dim - 2:
+                neighbours.append((y + 2, x))
+
+            y_, x_ = neighbours[rng.randint(0, len(neighbours))]
+            if Z[y_][x_] == 0:
+                Z[y_][x_] = 1
+                Z[y_ + (y - y_) // 2][x_ + (x - x_) // 2] = 1
+                x, y = x_, y_
+            elif all(Z[n_y][n_x] for n_y, n_x in neighbours):
+                rng.randint(0, len(neighbours), size=complexity - j - 1)
+                break
+
+    return np.array(Z, dtype=int)
+
+
+def open_distances(map_, start):
+    """
+    Breadth first search over the open cells from start, one frontier per
+    step.
+
+    Returns
+    -------
+    numpy int array
+        The number of steps to every reachable open cell and -1 everywhere
+        else.
+    """
+    h, w = map_.shape
+    is_open = (map_ == 0).ravel()
+    dist = np.full(h * w, -1, dtype=np.int64)
+    offsets = np.array([-w, w, -1, 1])
+
+    frontier = np.array([start[0] * w + start[1]])
+    frontier = frontier[is_open[frontier]]
+    dist[frontier] = 0
+
+    d = 0
+    while len(frontier):
+        d += 1
+        # open cells are never on the border so the neighbours are in range.
+        nxt = np.unique((frontier[:, np.newaxis] + offsets).ravel())
+        nxt = nxt[is_open[nxt] & (dist[nxt] < 0)]
+        dist[nxt] = d
+        frontier = nxt
+
+    return dist.reshape(h, w)
+
+
+def wall_distances(map_, start):
+    """
+    Gives each wall the distance of its nearest reachable open neighbour
+    plus one, see :func:`open_distances`.
+
+    Returns
+    -------
+    numpy int array
+        The distance for every reachable wall and -1 everywhere else.
+    """
+    h, w = map_.shape
+    dist = open_distances(map_, start)
+
+    big = np.iinfo(np.int64).max
+    reach = np.full((h + 2, w + 2), big, dtype=np.int64)
+    reach[1:-1, 1:-1] = np.where(dist >= 0, dist, big)
+
+    nearest = np.minimum(
+        np.minimum(reach[:-2, 1:-1], reach[2:, 1:-1]),
+        np.minimum(reach[1:-1, :-2], reach[1:-1, 2:]))
+
+    walls = (map_ != 0) & (nearest < big)
+    out = np.full((h, w), -1, dtype=np.int64)
+    out[walls] = nearest[walls] + 1
+
+    return out
+
+
+def _searched_walls(map_, start):
+    # The search RaycastMaze has always used to place its target, kept as is
+    # so seeded games get the same targets. It goes in rounds over the cells
+    # found but not yet searched. A cell that a neighbour reaches again in
+    # the same round counts as searched without being expanded, so some
+    # walls get a larger distance than the shortest, or are never found.
+    start = (int(start[0]), int(start[1]))
+    if map_[start] != 0:
+        return {}
+
+    dist = {start: 0}
+    searched = {start: False}
+    found = [start]
+    walls = {}
+
+    to_search = [start]
+    while to_search:
+        for y, x in to_search:
+            d = dist[y, x]
+            for dy, dx in [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]:
+                cell = (y + dy, x + dx)
+                step = 0 if cell == (y, x) else 1
+                if map_[cell] == 0:
+                    if cell not in dist:
+                        dist[cell] = d + step
+                        searched[cell] = step == 0
+                        found.append(cell)
+                    else:
+                        searched[cell] = True
+                elif cell not in walls:
+                    walls[cell] = d + step
+
+        to_search = [cell for cell in found if not searched[cell]]
+
+    return walls
+
+
+def target_candidates(map_, start, max_dist):
+    """
+    The (y, x) of every plain wall, ie. of type 1, that is reachable from
+    start within max_dist steps, in row-major order.
+
+    The distances are those of the search RaycastMaze has always used
+    rather than :func:`wall_distances`. That search misses some shorter
+    paths and, in larger mazes, some walls, but it keeps the targets of
+    seeded games the same as in earlier releases.
+    """
+    walls = _searched_walls(map_, start)
+    return np.array(sorted(cell for cell, d in walls.items()
+                           if d <= max_dist and map_[cell] == 1),
+                    dtype=np.int64).reshape(-1, 2)
+
+
+def make_layout(rng, map_size, max_dist, start=(1, 1)):
+    """
+    Generates a maze and picks its target, a plain wall reachable from
+    start within max_dist steps. The target is set to 2 in the map.
+
+    Returns
+    -------
+    tuple
+        The map and the target location with the shape (1, 2).
+    """
+    map_ = make_maze(rng, map_size)
+    candidates = target_candidates(map_, start, max_dist)
+
+    obj_loc = candidates[[rng.randint(0, high=len(candidates))]]
+    map_[obj_loc[0][0], obj_loc[0][1]] = 2
+
+    return map_, obj_loc
+
+
+class MazePool(object):
+    """
+    ple.games.raycastmaze.MazePool(size=16, seed=None)
+
+    Generates RaycastMaze layouts ahead of time on background threads so a
+    reset only has to take a finished one. Pass an instance to
+    :class:`RaycastMaze` with `maze_pool`, one pool can be shared by
+    several games.
+
+    Each (map_size, init_pos_distance_to_target, init_pos) gets its own
+    thread and RandomState, and its layouts are handed out in the order
+    they were generated. The layouts a game sees therefore only depend on
+    the seed, not on timing. They do differ from the ones generated
+    without a pool.
+
+    Parameters
+    ----------
+    size: int (default: 16)
+        The number of ready layouts kept for each key.
+
+    seed: int or None (default: None)
+        Seeds the layouts, the seed of each key is derived from it. If
+        None the seed of a key is drawn from the rng of the first game
+        that asks for it.
+
+    """
+
+    def __init__(self, size=16, seed=None):
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+
+        self.size = size
+        self.seed = seed
+        self._queues = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def get(self, map_size, max_dist, start=(1, 1), rng=None):
+        """
+        Takes the next layout for the key, waiting for one if the pool has
+        not caught up.
+
+        Parameters
+        ----------
+        map_size: int
+            The size of the maze, see :class:`RaycastMaze`.
+
+        max_dist: int
+            The furthest the target may be from start.
+
+        start: tuple of int (default: (1, 1))
+            The position the player starts on.
+
+        rng: numpy.random.RandomState (default: None)
+            Seeds a new key when the pool has no seed.
+
+        Returns
+        -------
+        tuple
+            The map and the target location, see :func:`make_layout`.
+
+        Raises
+        ------
+        Exception
+            The error the thread of the key stopped with, if generating a
+            layout failed.
+
+        """
+        key = (int(map_size), int(max_dist), tuple(int(v) for v in start))
+
+        with self._lock:
+            layouts = self._queues.get(key)
+            if layouts is None:
+                layouts = queue.Queue(maxsize=self.size)
+                self._queues[key] = layouts
+
+                if self.seed is not None:
+                    seed = np.random.RandomState(
+                        [self.seed, key[0], key[1]] + list(key[2]))
+                    seed = seed.randint(0, 2**31 - 1)
+                elif rng is not None:
+                    seed = rng.randint(0, 2**31 - 1)
+                else:
+                    seed = None
+
+                thread = threading.Thread(target=self._fill,
+                                          args=(layouts, key, seed))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+        layout = layouts.get()
+        if isinstance(layout, Exception):
+            # the thread has stopped, leave the error for the next caller.
+            layouts.put(layout)
+            raise layout
+
+        return layout
+
+    def _fill(self, layouts, key, seed):
+        rng = np.random.RandomState(seed)
+        map_size, max_dist, start = key
+
+        while not self._stop.is_set():
+            try:
+                layout = make_layout(rng, map_size, max_dist, start)
+            except Exception as e:
+                # handed to get() instead of a layout, which raises it.
+                layout = e
+
+            while not self._stop.is_set():
+                try:
+                    layouts.put(layout, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+            if isinstance(layout, Exception):
+                return
+
+    def close(self):
+        """
+        Stops the background threads.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+
 
 class RaycastMaze(PyGameWrapper, RayCastPlayer):
     """
@@ -35,15 +354,29 @@ class RaycastMaze(PyGameWrapper, RayCastPlayer):
         
      init_pos_distance_to_target : int (default None aka. map_size*map_size)
         Useful for curriculum learning, slowly move target away from init position to improve learning
+
+    maze_pool : MazePool (default: None)
+        Takes each maze from this pool of pre-generated layouts instead of
+        generating it on reset.
+
+    observation_dims : tuple of int (default: None)
+        The (width, height) of the observation. One ray is cast for each of
+        its columns and the walls are drawn straight at this size, eg. 32x32
+        for cheap training. The window, if shown, is still drawn separately
+        at width x height with the given resolution. None observes the
+        window itself.
   
     """
 
     def __init__(self,
                  init_pos=(1, 1), resolution=1,
                  move_speed=20, turn_speed=13,
-                 map_size=10, height=48, width=48, init_pos_distance_to_target=None):
+                 map_size=10, height=48, width=48, init_pos_distance_to_target=None,
+                 maze_pool=None, observation_dims=None,
+                 state_rays=16, state_patch=5):
 
         assert map_size > 5, "map_size must be gte 5"
+        assert state_patch % 2 == 1, "state_patch must be odd"
 
         # do not change
         init_dir = (1.0, 0.0)
@@ -85,49 +418,36 @@ class RaycastMaze(PyGameWrapper, RayCastPlayer):
 
         self.obj_loc = None
         self.map_size = map_size
+        self.maze_pool = maze_pool
         self.is_game_over = False
 
+        if observation_dims is None:
+            self.observation_dims = (width, height)
+            self._observation_resolution = resolution
+        else:
+            self.observation_dims = tuple(observation_dims)
+            self._observation_resolution = 1
+
+        # frames are rasterized into this array, which is also what
+        # getScreenRGB returns. The surface is only updated when shown.
+        self._frame = np.zeros(self.observation_dims + (3,), dtype=np.uint8)
+        self._background = make_background(*self.observation_dims)
+
+        # the window is drawn on its own when it differs from the observation.
+        self._display_frame = None
+
+        # patch cell (i, j) is i cells ahead and j cells to the right of the
+        # player, with the furthest row ahead first.
+        self.state_rays = state_rays
+        self.state_patch = state_patch
+        reach = state_patch // 2
+        self._patch_ahead = np.repeat(
+            np.arange(reach, -reach - 1, -1.0), state_patch)[:, np.newaxis]
+        self._patch_right = np.tile(
+            np.arange(-reach, reach + 1.0), state_patch)[:, np.newaxis]
+
     def _make_maze(self, complexity=0.75, density=0.75):
-        """
-            ty wikipedia?
-        """
-        dim = int(np.floor(self.map_size / 2) * 2 + 1)
-        shape = (dim, dim)
-
-        complexity = int(complexity * (5 * (shape[0] + shape[1])))
-        density = int(density * (shape[0] // 2 * shape[1] // 2))
-
-        # Build actual maze
-        Z = np.zeros(shape, dtype=bool)
-        # Fill borders
-        Z[0, :] = Z[-1, :] = 1
-        Z[:, 0] = Z[:, -1] = 1
-        # Make isles
-        for i in range(density):
-            x = self.rng.random_integers(0, shape[1] // 2) * 2
-            y = self.rng.random_integers(0, shape[0] // 2) * 2
-
-            Z[y, x] = 1
-            for j in range(complexity):
-                neighbours = []
-                if x > 1:
-                    neighbours.append((y, x - 2))
-                if x < shape[1] - 2:
-                    neighbours.append((y, x + 2))
-                if y > 1:
-                    neighbours.append((y - 2, x))
-                if y < shape[0] - 2:
-                    neighbours.append((y + 2, x))
-                if len(neighbours):
-                    y_, x_ = neighbours[
-                        self.rng.random_integers(
-                            0, len(neighbours) - 1)]
-                    if Z[y_, x_] == 0:
-                        Z[y_, x_] = 1
-                        Z[y_ + (y - y_) // 2, x_ + (x - x_) // 2] = 1
-                        x, y = x_, y_
-
-        return Z.astype(int)
+        return make_maze(self.rng, self.map_size, complexity, density)
 
     def getGameState(self):
         """
@@ -135,12 +455,77 @@ class RaycastMaze(PyGameWrapper, RayCastPlayer):
         Returns
         -------
 
-        None
-            Does not have a non-visual representation of game state.
-            Would be possible to return the location of the maze end.
+        dict
+            * player x position.
+            * player y position.
+            * player direction x.
+            * player direction y.
+            * angle between the player direction and the target in radians.
+            * distance to the wall along each of `state_rays` rays.
+            * occupancy patch around the player, 0 for open, 1 for walls and
+              2 for the target. It turns with the player, row 0 is furthest
+              ahead and column 0 furthest to the left.
+
+            See code for structure.
 
         """
-        return None
+        state = {
+            "player_x": float(self.pos[0, 0]),
+            "player_y": float(self.pos[0, 1]),
+            "dir_x": float(self.dir[0, 0]),
+            "dir_y": float(self.dir[0, 1]),
+            "angle_to_target": float(self.angle_to_obj_rad()),
+            "ray_distances": self._ray_distances(),
+            "occupancy": self._occupancy(),
+        }
+
+        return state
+
+    def getGameStateFields(self):
+        fields = ["player_x", "player_y", "dir_x", "dir_y", "angle_to_target"]
+        fields += ["ray_distance_%d" % i for i in range(self.state_rays)]
+        fields += ["occupancy_%d_%d" % (i, j)
+                   for i in range(self.state_patch)
+                   for j in range(self.state_patch)]
+
+        return tuple(fields)
+
+    def getGameStateVector(self, out=None):
+        """
+        Same values as :func:`getGameState` in a fixed layout, with the
+        occupancy patch flattened row by row.
+        """
+        out = self._state_vector(out)
+        rays = 5 + self.state_rays
+
+        out[0:2] = self.pos[0]
+        out[2:4] = self.dir[0]
+        out[4] = self.angle_to_obj_rad()
+        out[5:rays] = self._ray_distances()
+        out[rays:] = self._occupancy().ravel()
+
+        return out
+
+    def _ray_distances(self):
+        return ray_distances(self.pos, self.dir, self.plane,
+                             self.map_[np.newaxis], self.state_rays,
+                             eps=self.eps)[0]
+
+    def _occupancy(self):
+        ahead = self.dir[0] / math.sqrt(self.dir[0, 0]**2 + self.dir[0, 1]**2)
+        right = self.plane[0] / math.sqrt(
+            self.plane[0, 0]**2 + self.plane[0, 1]**2)
+
+        points = (self.pos[0] + self._patch_ahead * ahead +
+                  self._patch_right * right)
+        cells = np.floor(points).astype(int)
+
+        # cells outside the maze count as walls.
+        inside = ((cells >= 0) & (cells < self.map_.shape)).all(axis=1)
+        patch = np.ones(cells.shape[0], dtype=self.map_.dtype)
+        patch[inside] = self.map_[cells[inside, 0], cells[inside, 1]]
+
+        return patch.reshape(self.state_patch, self.state_patch)
 
     def getScore(self):
         return self.score
@@ -148,69 +533,22 @@ class RaycastMaze(PyGameWrapper, RayCastPlayer):
     def game_over(self):
         return self.is_game_over
 
-    def getFiltredPositions(self, pos_input, pos_list, wall_list):
-        pos_check = pos_input['pos']
-        if self.map_[pos_check[0], pos_check[1]] == 0:
-            for y, x in [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]:
-                if self.map_[pos_check[0] + y, pos_check[1] + x] == 0:
-                    # aile
-                    if not any(it for it in pos_list if it['pos'][0] == pos_check[0] + y and it['pos'][1] == pos_check[1] + x):
-                        pos_list.append({
-                            'pos': [pos_check[0] + y, pos_check[1] + x],
-                            'dist': pos_input['dist'] + (0 if (x == 0 and y == 0) else 1),
-                            'checked': (x == 0 and y == 0)
-                        })
-                    else:
-                        for it in pos_list:
-                            if it['pos'][0] == pos_check[0] + y and it['pos'][1] == pos_check[1] + x:
-                                it['checked'] = True
-                                break
-                else:
-                    # wall
-                    if not any(it for it in wall_list if it['pos'][0] == pos_check[0] + y and it['pos'][1] == pos_check[1] + x):
-                        wall_list.append({
-                            'pos': [pos_check[0] + y, pos_check[1] + x],
-                            'dist': pos_input['dist'] + (0 if (x == 0 and y == 0) else 1)
-                        })
-
-
     def init(self):
         self.score = 0 #reset score
         self.is_game_over = False
+        self._movement = None
         self.pos = np.copy(self.init_pos)
         self.dir = np.copy(self.init_dir)
         self.plane = np.copy(self.init_plane)
 
-        self.map_ = self._make_maze()
-
-        pos_list = []
-        wall_list = []
-        check_list = []
-        pos_input = {
-            'pos': self.pos.astype(np.int)[0],
-            'dist': 0,
-            'checked': False
-        }
-        pos_list.append(pos_input)
-        check_list.append(pos_input)
-        while len(check_list):
-            for pos_each in check_list:
-                self.getFiltredPositions(pos_each, pos_list, wall_list)
-            check_list = [it for it in pos_list if not it['checked']]
-
-
-        available_positions = []
-        for y in range(self.map_size + 1):
-            for x in range(self.map_size + 1):
-                # in a wall
-                if self.map_[y, x] == 1:
-                    # check access to this point
-                    if any(it for it in wall_list if it['dist'] <= self.init_pos_distance_to_target and it['pos'][0] == y and it['pos'][1] == x):
-                        available_positions.append([y,x])
-
-
-        self.obj_loc = np.array([available_positions[self.rng.randint(0, high=len(available_positions))]])
-        self.map_[self.obj_loc[0][0], self.obj_loc[0][1]] = 2
+        start = self.pos.astype(int)[0]
+        if self.maze_pool is None:
+            self.map_, self.obj_loc = make_layout(
+                self.rng, self.map_size, self.init_pos_distance_to_target, start)
+        else:
+            self.map_, self.obj_loc = self.maze_pool.get(
+                self.map_size, self.init_pos_distance_to_target, start,
+                rng=self.rng)
 
         if self.angle_to_obj_rad() < 1.5:
             # turn away from target at init state
@@ -220,6 +558,13 @@ class RaycastMaze(PyGameWrapper, RayCastPlayer):
     def reset(self):
         self.init()
 
+    def _setAction(self, action, last_action):
+        # a key action from PLE replaces the movement from setMovement.
+        if action is not None and action != self.NOOP:
+            self._movement = None
+
+        PyGameWrapper._setAction(self, action, last_action)
+
     def normalize(self, vector):
         norm = math.sqrt(vector[0][0] ** 2 + vector[0][1] ** 2)
         vector[0][0] /= norm
@@ -227,30 +572,84 @@ class RaycastMaze(PyGameWrapper, RayCastPlayer):
         return vector
 
     def step(self, dt):
-        self.screen.fill((0, 0, 0))
-        pygame.draw.rect(self.screen, (92, 92, 92),
-                         (0, self.height / 2, self.width, self.height))
-
         if not self.is_game_over:
             self.score += self.rewards["tick"]
 
             self._handle_player_events(dt)
 
-            c, t, b, col = self.draw()
-
-            for i in range(len(c)):
-                color = (col[i][0], col[i][1], col[i][2])
-                p0 = (c[i], t[i])
-                p1 = (c[i], b[i])
-
-                pygame.draw.line(self.screen, color, p0, p1, self.resolution)
-
             dist = np.sqrt(np.sum((self.pos[0] - (self.obj_loc[0] + 0.5))**2.0))
             # Close to target object and in sight
             if dist < 1.1 and self.angle_to_obj_rad() < 0.8:
                 self.score += self.rewards["win"]
                 self.is_game_over = True
 
+    def _rasterize(self, width, height, resolution, background, out):
+        columns, tops, bottoms, colors = cast_rays(
+            self.pos, self.dir, self.plane, self.map_[np.newaxis],
+            width, height, resolution, self.shade_table, eps=self.eps)
+
+        rasterize(columns, tops[0], bottoms[0], colors[0], resolution,
+                  background, out)
+
+    def render(self):
+        self._rasterize(self.observation_dims[0], self.observation_dims[1],
+                        self._observation_resolution, self._background,
+                        self._frame)
+
+    def _draw_frame(self, draw_screen):
+        if draw_screen and not self.headless:
+            frame = self._frame
+            if self.observation_dims != self.screen_dim:
+                if self._display_frame is None:
+                    self._display_frame = np.zeros(
+                        self.screen_dim + (3,), dtype=np.uint8)
+                    self._display_background = make_background(
+                        *self.screen_dim)
+
+                frame = self._display_frame
+                self._rasterize(self.width, self.height, self.resolution,
+                                self._display_background, frame)
+
+            pygame.surfarray.blit_array(self.screen, frame)
+
+        PyGameWrapper._draw_frame(self, draw_screen)
+
+    def getScreenDims(self):
+        """
+        Gets the observation dimensions, see `observation_dims`.
+
+        Returns
+        -------
+        tuple of int
+            Returns tuple as follows (width, height).
+
+        """
+        return self.observation_dims
+
+    def getScreenRGB(self, out=None):
+        """
+        Returns the last rendered frame, read straight from the array it was
+        rasterized into.
+
+        Parameters
+        ----------
+        out : numpy uint8 array (default: None)
+            If given the frame is copied into this array, which must have
+            the shape of :func:`getScreenDims` plus 3, and it is returned.
+
+        Returns
+        --------
+        numpy uint8 array
+            Returns a numpy array with the shape of :func:`getScreenDims`
+            plus 3.
+
+        """
+        if out is None:
+            return self._frame.copy()
+
+        np.copyto(out, self._frame)
+        return out
+
     def angle_to_obj_rad(self):
         dir_to_loc = (self.obj_loc + 0.5) - self.pos
         dir_to_loc = self.normalize(dir_to_loc)
@@ -270,7 +669,7 @@ if __name__ == "__main__":
         map_size=10
     )
 
-    game.screen = pygame.display.set_mode(game.getScreenDims(), 0, 32)
+    game.screen = pygame.display.set_mode(game.screen_dim, 0, 32)
     game.clock = pygame.time.Clock()
     game.rng = np.random.RandomState(24)
     game.init()
@@ -284,5 +683,5 @@ if __name__ == "__main__":
             game.reset()
 
         game.step(dt)
-
-        pygame.display.update()
+        game.render()
+        game._draw_frame(True)
@@ -1,5 +1,4 @@
 import pygame
-import sys
 import math
 
 #import .base
@@ -218,12 +217,16 @@ class Snake(PyGameWrapper):
     init_length : int (default: 3)
         The starting number of segments the snake has. Do not set below 3 segments. Has issues with hitbox detection with the body for lower values.
 
+    state_segments : int (default: 32)
+        The number of body segments kept in the state vector. Longer snakes are truncated and shorter ones are padded with zeros.
+
     """
 
     def __init__(self,
                  width=64,
                  height=64,
-                 init_length=3):
+                 init_length=3,
+                 state_segments=32):
 
         actions = {
             "up": K_w,
@@ -243,36 +246,30 @@ class Snake(PyGameWrapper):
 
         self.INIT_POS = (width / 2, height / 2)
         self.init_length = init_length
+        self.state_segments = state_segments
 
         self.BG_COLOR = (25, 25, 25)
 
     def _handle_player_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                key = event.key
-
-                #left = -1
-                #right = 1
-                #up = -1
-                #down = 1
+        for key in self._get_keys():
+            #left = -1
+            #right = 1
+            #up = -1
+            #down = 1
 
-                if key == self.actions["left"] and self.player.dir.x != 1:
-                    self.player.dir = vec2d((-1, 0))
+            if key == self.actions["left"] and self.player.dir.x != 1:
+                self.player.dir = vec2d((-1, 0))
 
-                if key == self.actions["right"] and self.player.dir.x != -1:
-                    self.player.dir = vec2d((1, 0))
+            if key == self.actions["right"] and self.player.dir.x != -1:
+                self.player.dir = vec2d((1, 0))
 
-                if key == self.actions["up"] and self.player.dir.y != 1:
-                    self.player.dir = vec2d((0, -1))
+            if key == self.actions["up"] and self.player.dir.y != 1:
+                self.player.dir = vec2d((0, -1))
 
-                if key == self.actions["down"] and self.player.dir.y != -1:
-                    self.player.dir = vec2d((0, 1))
+            if key == self.actions["down"] and self.player.dir.y != -1:
+                self.player.dir = vec2d((0, 1))
 
-                self.player.update_head = True
+            self.player.update_head = True
 
     def getGameState(self):
         """
@@ -308,6 +305,41 @@ class Snake(PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        fields = ["snake_head_x", "snake_head_y", "food_x", "food_y",
+                  "snake_length"]
+        for i in range(self.state_segments):
+            fields += ["snake_body_%d" % i,
+                       "snake_body_x_%d" % i, "snake_body_y_%d" % i]
+
+        return tuple(fields)
+
+    def getGameStateVector(self, out=None):
+        """
+        Same values as :func:`getGameState` in a fixed layout. Each body
+        segment takes three entries, its distance to the head and its x and
+        y position, for the first `state_segments` segments.
+        """
+        out = self._state_vector(out)
+        head = self.player.head.pos
+
+        out[0] = head.x
+        out[1] = head.y
+        out[2] = self.food.pos.x
+        out[3] = self.food.pos.y
+        out[4] = self.player.length
+
+        body = out[5:].reshape(self.state_segments, 3)
+        n = min(len(self.player.body), self.state_segments)
+        for i in range(n):
+            s = self.player.body[i].pos
+            body[i, 0] = math.sqrt((head.x - s.x)**2 + (head.y - s.y)**2)
+            body[i, 1] = s.x
+            body[i, 2] = s.y
+        body[n:] = 0.0
+
+        return out
+
     def getScore(self):
         return self.score
 
@@ -350,7 +382,6 @@ class Snake(PyGameWrapper):
         dt /= 1000.0
 
         self.ticks += 1
-        self.screen.fill(self.BG_COLOR)
         self._handle_player_events()
         self.score += self.rewards["tick"]
 
@@ -384,6 +415,8 @@ class Snake(PyGameWrapper):
 
         self.player.update(dt)
 
+    def render(self):
+        self.screen.fill(self.BG_COLOR)
         self.player.draw(self.screen)
         self.food.draw(self.screen)
 
@@ -404,4 +437,5 @@ if __name__ == "__main__":
 
         dt = game.clock.tick_busy_loop(30)
         game.step(dt)
+        game.render()
         pygame.display.update()
@@ -1,5 +1,45 @@
 import numpy as np
+import pygame
 
 
 def percent_round_int(percent, x):
     return np.round(percent * x).astype(int)
+
+
+def convert_image(image, alpha=False):
+    """
+    Converts the image to the display's pixel format for faster blits. Without
+    a display, eg. when running headless, it is converted to the format of
+    the off-screen surface instead, see :func:`convert_offscreen`.
+    """
+    if pygame.display.get_surface() is None:
+        return convert_offscreen(image, alpha=alpha)
+
+    if alpha:
+        return image.convert_alpha()
+
+    return image.convert()
+
+
+def convert_offscreen(image, alpha=False):
+    """
+    Converts the image to the 32 bit pixel format of the off-screen surface
+    headless games draw to, with per-pixel alpha if alpha is True, the same
+    as `convert` and `convert_alpha` would for a 32 bit display. Unlike
+    those it works without a display.
+    """
+    flags = pygame.SRCALPHA if alpha else 0
+    converted = pygame.Surface(image.get_size(), flags, 32)
+    pygame.surfarray.blit_array(converted, pygame.surfarray.array3d(image))
+
+    if alpha:
+        if image.get_flags() & pygame.SRCALPHA:
+            opacity = pygame.surfarray.array_alpha(image)
+        else:
+            # a colorkey becomes transparent, as with convert_alpha.
+            opacity = pygame.surfarray.array_colorkey(image)
+        pygame.surfarray.pixels_alpha(converted)[:] = opacity
+    elif image.get_colorkey() is not None:
+        converted.set_colorkey(image.get_colorkey()[:3])
+
+    return converted
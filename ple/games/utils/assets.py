@@ -0,0 +1,58 @@
+import os
+
+import pygame
+
+from . import convert_offscreen
+
+# (path, size, alpha) -> surface, shared by every game in the process. The
+# surfaces are all in the 32 bit format of the screens games draw to.
+_images = {}
+
+
+def load_image(path, size=None, alpha=False):
+    """
+    Loads an image, scales it and converts it to the 32 bit format of the
+    game screens, once per process. Headless or not, games draw to a 32 bit
+    screen, so the same surface is fast to blit in both. Later calls with the same arguments return the same surface,
+    so games and their resets stop decoding the PNGs again.
+
+    The surface is shared and must not be drawn on.
+
+    Parameters
+    ----------
+    path : str
+        The image file.
+
+    size : tuple of int (default: None)
+        The (width, height) to scale the image to. None keeps its size.
+
+    alpha : bool (default: False)
+        Keep per-pixel alpha, see :func:`ple.games.utils.convert_offscreen`.
+
+    Returns
+    -------
+    pygame.Surface
+
+    """
+    if size is not None:
+        size = tuple(size)
+
+    key = (os.path.abspath(path), size, alpha)
+
+    image = _images.get(key)
+    if image is None:
+        image = pygame.image.load(path)
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+
+        image = convert_offscreen(image, alpha=alpha)
+        _images[key] = image
+
+    return image
+
+
+def clear_cache():
+    """
+    Drops every cached image.
+    """
+    _images.clear()
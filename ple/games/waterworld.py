@@ -1,5 +1,4 @@
 import pygame
-import sys
 import math
 
 #import .base
@@ -70,25 +69,18 @@ class WaterWorld(PyGameWrapper):
     def _handle_player_events(self):
         self.dx = 0
         self.dy = 0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        for key in self._get_keys():
+            if key == self.actions["left"]:
+                self.dx -= self.AGENT_SPEED
 
-            if event.type == pygame.KEYDOWN:
-                key = event.key
+            if key == self.actions["right"]:
+                self.dx += self.AGENT_SPEED
 
-                if key == self.actions["left"]:
-                    self.dx -= self.AGENT_SPEED
+            if key == self.actions["up"]:
+                self.dy -= self.AGENT_SPEED
 
-                if key == self.actions["right"]:
-                    self.dx += self.AGENT_SPEED
-
-                if key == self.actions["up"]:
-                    self.dy -= self.AGENT_SPEED
-
-                if key == self.actions["down"]:
-                    self.dy += self.AGENT_SPEED
+            if key == self.actions["down"]:
+                self.dy += self.AGENT_SPEED
 
     def _add_creep(self):
         creep_type = self.rng.choice([0, 1])
@@ -159,6 +151,40 @@ class WaterWorld(PyGameWrapper):
 
         return state
 
+    def getGameStateFields(self):
+        fields = ["player_x", "player_y",
+                  "player_velocity_x", "player_velocity_y"]
+        for i in range(self.N_CREEPS):
+            fields += ["creep_%d_good" % i, "creep_%d_x" % i,
+                       "creep_%d_y" % i, "creep_%d_dist" % i]
+
+        return tuple(fields)
+
+    def getGameStateVector(self, out=None):
+        """
+        Same values as :func:`getGameState` in a fixed layout. Each creep
+        takes four entries, 1.0 if it is good and 0.0 if bad, its x and y
+        position and its distance to the player.
+        """
+        out = self._state_vector(out)
+        player = self.player.pos
+
+        out[0] = player.x
+        out[1] = player.y
+        out[2] = self.player.vel.x
+        out[3] = self.player.vel.y
+
+        creeps = out[4:].reshape(self.N_CREEPS, 4)
+        creeps[...] = 0.0
+        for i, c in enumerate(self.creeps):
+            creeps[i, 0] = c.TYPE == "GOOD"
+            creeps[i, 1] = c.pos.x
+            creeps[i, 2] = c.pos.y
+            creeps[i, 3] = math.sqrt((player.x - c.pos.x)**2 +
+                                     (player.y - c.pos.y)**2)
+
+        return out
+
     def getScore(self):
         return self.score
 
@@ -202,7 +228,6 @@ class WaterWorld(PyGameWrapper):
             Perform one step of game emulation.
         """
         dt /= 1000.0
-        self.screen.fill(self.BG_COLOR)
 
         self.score += self.rewards["tick"]
 
@@ -220,6 +245,8 @@ class WaterWorld(PyGameWrapper):
 
         self.creeps.update(dt)
 
+    def render(self):
+        self.screen.fill(self.BG_COLOR)
         self.player.draw(self.screen)
         self.creeps.draw(self.screen)
 
@@ -236,4 +263,5 @@ if __name__ == "__main__":
     while True:
         dt = game.clock.tick_busy_loop(30)
         game.step(dt)
+        game.render()
         pygame.display.update()
@@ -0,0 +1,207 @@
+import numpy as np
+
+
+class ObservationPipeline(object):
+    """
+    ple.ObservationPipeline(
+        dims=(84, 84), grayscale=True,
+        frame_stack=4, max_pool=True
+    )
+
+    Turns raw screens into a stacked observation ready for a network.
+    Each frame is converted to grayscale, shrunk with an area-average and
+    pushed onto a stack of the last k frames. Everything is done with
+    integer numpy operations into preallocated arrays.
+
+    Pass an instance to :class:`ple.PLE` with `observation_pipeline` and
+    read the result with :func:`ple.PLE.getObservation` after each act.
+
+    Parameters
+    ----------
+    dims: tuple of int (default: (84, 84))
+        The (width, height) frames are resized to. None keeps the screen size.
+
+    grayscale: bool (default: True)
+        Convert frames to grayscale. Uses the same relative luminance weights
+        as :func:`ple.PLE.getScreenGrayscale`, in 8 bit fixed point.
+
+    frame_stack: int (default: 4)
+        The number of most recent frames, k, in each observation.
+
+    max_pool: bool (default: True)
+        Take the pixel-wise max of the last two frames of each action when
+        PLE skips frames. This removes the flicker of objects drawn on
+        alternate frames.
+
+    """
+
+    # 0.21, 0.72 and 0.07 scaled by 256, the sum is exactly 256.
+    GRAY_WEIGHTS = (54, 184, 18)
+
+    def __init__(self, dims=(84, 84), grayscale=True,
+                 frame_stack=4, max_pool=True):
+        if frame_stack < 1:
+            raise ValueError("frame_stack must be at least 1.")
+
+        self.dims = None if dims is None else tuple(dims)
+        self.grayscale = grayscale
+        self.frame_stack = frame_stack
+        self.max_pool = max_pool
+
+        self.screen_dims = None
+        self.rgb = None  # PLE copies the screen here.
+        self._has_held = False
+        self._empty = True
+        self._index = 0
+
+    def _allocate(self, screen_dims):
+        self.screen_dims = tuple(screen_dims)
+        dims = self.screen_dims if self.dims is None else self.dims
+
+        if dims[0] > self.screen_dims[0] or dims[1] > self.screen_dims[1]:
+            raise ValueError("Can not upscale %s frames to %s." %
+                             (self.screen_dims, dims))
+
+        channels = () if self.grayscale else (3,)
+        self.frame_shape = dims + channels
+
+        self.rgb = np.empty(self.screen_dims + (3,), dtype=np.uint8)
+        self._held = np.empty(self.screen_dims + channels, dtype=np.uint8)
+        self._frame = np.empty(self.screen_dims + channels, dtype=np.uint8)
+        self._gray = np.empty(self.screen_dims, dtype=np.uint16)
+        self._scratch = np.empty(self.screen_dims, dtype=np.uint16)
+
+        # area-average bins along each axis. Output pixel i covers the source
+        # pixels starts[i] up to starts[i + 1].
+        self._resize = dims != self.screen_dims
+        if self._resize:
+            self._starts = []
+            counts = []
+            for src, dst in zip(self.screen_dims, dims):
+                starts = (np.arange(dst) * src) // dst
+                self._starts.append(starts)
+                counts.append(np.diff(np.append(starts, src)))
+
+            count = np.outer(counts[0], counts[1]).astype(np.uint32)
+            if not self.grayscale:
+                count = count[:, :, np.newaxis]
+
+            self._count = count
+            self._half_count = count // 2
+            self._rows = np.empty(
+                (dims[0], self.screen_dims[1]) + channels, dtype=np.uint32)
+            self._area = np.empty(dims + channels, dtype=np.uint32)
+
+        # every frame is written twice, k apart, so the k newest frames are
+        # always a contiguous slice of the ring.
+        self._ring = np.zeros(
+            (2 * self.frame_stack,) + self.frame_shape, dtype=np.uint8)
+
+    def _convert(self, rgb, out):
+        if not self.grayscale:
+            np.copyto(out, rgb)
+            return out
+
+        r, g, b = self.GRAY_WEIGHTS
+        gray = self._gray
+        scratch = self._scratch
+
+        np.multiply(rgb[:, :, 0], r, out=gray, dtype=np.uint16)
+        np.multiply(rgb[:, :, 1], g, out=scratch, dtype=np.uint16)
+        gray += scratch
+        np.multiply(rgb[:, :, 2], b, out=scratch, dtype=np.uint16)
+        gray += scratch
+        gray += 128
+        np.right_shift(gray, 8, out=gray)
+        np.copyto(out, gray, casting="unsafe")
+
+        return out
+
+    def _shrink(self, frame, out):
+        if not self._resize:
+            np.copyto(out, frame)
+            return out
+
+        np.add.reduceat(frame, self._starts[0], axis=0,
+                        dtype=np.uint32, out=self._rows)
+        np.add.reduceat(self._rows, self._starts[1], axis=1,
+                        dtype=np.uint32, out=self._area)
+
+        area = self._area
+        area += self._half_count
+        np.floor_divide(area, self._count, out=area)
+        np.copyto(out, area, casting="unsafe")
+
+        return out
+
+    def reset(self):
+        """
+        Clears the stack. The next frame pushed fills every slot.
+        """
+        self._has_held = False
+        self._empty = True
+        self._index = 0
+
+    def hold(self, rgb):
+        """
+        Keeps the second to last frame of an action for max pooling.
+
+        Parameters
+        ----------
+        rgb : numpy uint8 array
+            A screen with the shape (width, height, 3).
+        """
+        if self.rgb is None:
+            self._allocate(rgb.shape[:2])
+
+        self._convert(rgb, self._held)
+        self._has_held = True
+
+    def push(self, rgb):
+        """
+        Processes the last frame of an action and adds it to the stack.
+
+        Parameters
+        ----------
+        rgb : numpy uint8 array
+            A screen with the shape (width, height, 3).
+        """
+        if self.rgb is None:
+            self._allocate(rgb.shape[:2])
+
+        frame = self._convert(rgb, self._frame)
+        if self._has_held:
+            np.maximum(frame, self._held, out=frame)
+            self._has_held = False
+
+        k = self.frame_stack
+        ring = self._ring
+
+        if self._empty:
+            self._shrink(frame, ring[0])
+            ring[1:] = ring[0]
+            self._index = 0
+            self._empty = False
+        else:
+            self._index = (self._index + 1) % k
+            self._shrink(frame, ring[self._index])
+            ring[self._index + k] = ring[self._index]
+
+    def getObservation(self):
+        """
+        Gets the stacked frames, oldest first.
+
+        Returns
+        -------
+
+        numpy uint8 array
+            Shape (k, width, height) or (k, width, height, 3) if grayscale
+            is off. It is a view that later pushes overwrite, copy it if it
+            needs to be kept.
+
+        """
+        if self.rgb is None:
+            raise ValueError("No frame has been pushed yet.")
+
+        start = self._index + 1
+        return self._ring[start:start + self.frame_stack]
@@ -1,10 +1,21 @@
 import numpy as np
 from PIL import Image  # pillow
 import sys
+import time
 
 import pygame
 from .games.base.pygamewrapper import PyGameWrapper
 
+try:
+    _clock_ns = time.perf_counter_ns
+except AttributeError:  # python < 3.7
+    def _clock_ns():
+        return int(time.time() * 1e9)
+
+# the phases timed when profiling is on, see PLE.get_profile.
+PROFILE_PHASES = ("act", "dispatch", "step", "render", "display",
+                  "observation", "reward")
+
 class PLE(object):
     """
     ple.PLE(
@@ -13,7 +24,8 @@ class PLE(object):
         reward_values={}, force_fps=True,
         display_screen=False, add_noop_action=True,
         NOOP=K_F15, state_preprocessor=None,
-        rng=24
+        rng=24, headless=False,
+        observation_pipeline=None, profile=False
     )
 
     Main wrapper that interacts with games.
@@ -87,12 +99,28 @@ class PLE(object):
     rng: numpy.random.RandomState, int, array_like or None. (default: 24)
         Number generator which is used by PLE and the games.
 
+    headless: bool (default: False)
+        If True pygame games draw to an off-screen surface and no display
+        or SDL video driver is ever set up. This starts faster, allows
+        several games per process and works on machines without a display.
+        Cannot be combined with display_screen.
+
+    observation_pipeline: ple.ObservationPipeline (default: None)
+        If given each act() feeds the screen through the pipeline, eg.
+        grayscale, resize and frame stacking. The result is read with
+        getObservation().
+
+    profile: bool (default: False)
+        If True PLE times each phase of act(), see get_profile(). When
+        False the untimed code runs and there is no overhead.
+
     """
 
     def __init__(self,
                  game, fps=30, frame_skip=1, num_steps=1,
                  reward_values={}, force_fps=True, display_screen=False,
-                 add_noop_action=True, state_preprocessor=None, rng=24):
+                 add_noop_action=True, state_preprocessor=None, rng=24,
+                 headless=False, observation_pipeline=None, profile=False):
 
         self.game = game
         self.fps = fps
@@ -102,12 +130,44 @@ class PLE(object):
         self.force_fps = force_fps
         self.display_screen = display_screen
         self.add_noop_action = add_noop_action
+        self.headless = headless
+        self.observation_pipeline = observation_pipeline
+        self.profile = profile
+
+        if self.headless and self.display_screen:
+            raise ValueError("Cannot display the screen when headless.")
 
         self.last_action = []
         self.action = []
         self.previous_score = 0
         self.frame_count = 0
 
+        # the screen is only drawn when a frame is displayed or observed.
+        self._needs_render = True
+
+        # timed wrappers replace the methods of each phase once, here, so
+        # nothing is checked per call.
+        self._profile = None
+        if self.profile:
+            self.reset_profile()
+            for phase, name in [("act", "act"), ("dispatch", "_setAction"),
+                                ("step", "_stepGame"), ("render", "_renderGame"),
+                                ("display", "_draw_frame"), ("reward", "_getReward"),
+                                ("observation", "getGameState"),
+                                ("observation", "getGameStateVector")]:
+                setattr(self, name, self._timed(phase, getattr(self, name)))
+
+            # the screen is drawn before the observation timer starts.
+            self.getScreenRGB = self._renderFirst(
+                self._timed("observation", self.getScreenRGB))
+            self.getScreenGrayscale = self._renderFirst(
+                self._timed("observation", self.getScreenGrayscale))
+
+        # scratch buffers reused by getScreenGrayscale.
+        self._rgb_buffer = None
+        self._gray_buffer = None
+        self._gray_scratch = None
+
         # update the scores of games with values we pick
         if reward_values:
             self.game.adjustRewards(reward_values)
@@ -119,9 +179,12 @@ class PLE(object):
             else:
                 self.rng = np.random.RandomState(rng)
 
+            self.game.headless = self.headless
+
             # some pygame games preload the images
             # to speed resetting and inits up.
-            pygame.display.set_mode((1, 1), pygame.NOFRAME)
+            if not self.headless:
+                pygame.display.set_mode((1, 1), pygame.NOFRAME)
         else:
             # in order to use doom, install following https://github.com/openai/doom-py
             from .games.base.doomwrapper import DoomWrapper
@@ -165,6 +228,16 @@ class PLE(object):
         """
         self.game._setup()
         self.game.init() #this is the games setup/init
+        self._needs_render = True
+        self._startObservation()
+
+        # resolved once, act() only does a lookup. Doom actions are lists
+        # and can not be hashed.
+        self._action_set = self._makeActionSet()
+        try:
+            self._valid_actions = frozenset(self._action_set)
+        except TypeError:
+            self._valid_actions = self._action_set
 
     def getActionSet(self):
         """
@@ -179,6 +252,9 @@ class PLE(object):
             to perform.
 
         """
+        return list(self._action_set)
+
+    def _makeActionSet(self):
         actions = self.game.actions
 
         if (sys.version_info > (3, 0)): #python ver. 3
@@ -262,11 +338,28 @@ class PLE(object):
         self.action = []
         self.previous_score = 0.0
         self.game.reset()
+        self._needs_render = True
+        self._startObservation()
+
+    def _startObservation(self):
+        # the first screen of an episode fills the whole stack, so
+        # getObservation() is valid before the first act().
+        pipeline = self.observation_pipeline
+        if pipeline is not None:
+            pipeline.reset()
+            pipeline.push(self.getScreenRGB(out=pipeline.rgb))
 
-    def getScreenRGB(self):
+    def getScreenRGB(self, out=None):
         """
         Gets the current game screen in RGB format.
 
+        Parameters
+        ----------
+
+        out : numpy uint8 array (default: None)
+            If given the screen is written into this array, which must have
+            the shape (width, height, 3), instead of a new one.
+
         Returns
         --------
         numpy uint8 array
@@ -274,13 +367,21 @@ class PLE(object):
 
 
         """
+        self._render()
 
-        return self.game.getScreenRGB()
+        return self.game.getScreenRGB(out=out)
 
-    def getScreenGrayscale(self):
+    def getScreenGrayscale(self, out=None):
         """
         Gets the current game screen in Grayscale format. Converts from RGB using relative lumiance.
 
+        Parameters
+        ----------
+
+        out : numpy uint8 array (default: None)
+            If given the frame is written into this array, which must have
+            the shape (width, height), instead of a new one.
+
         Returns
         --------
         numpy uint8 array
@@ -288,12 +389,48 @@ class PLE(object):
 
 
         """
-        frame = self.getScreenRGB()
-        frame = 0.21 * frame[:, :, 0] + 0.72 * \
-            frame[:, :, 1] + 0.07 * frame[:, :, 2]
-        frame = np.round(frame).astype(np.uint8)
+        dims = tuple(self.getScreenDims())
+        if self._gray_buffer is None or self._gray_buffer.shape != dims:
+            self._rgb_buffer = np.empty(dims + (3,), dtype=np.uint8)
+            self._gray_buffer = np.empty(dims, dtype=np.float64)
+            self._gray_scratch = np.empty(dims, dtype=np.float64)
+
+        self._render()
+        frame = self.game.getScreenRGB(out=self._rgb_buffer)
+        gray = self._gray_buffer
+        scratch = self._gray_scratch
+
+        np.multiply(frame[:, :, 0], 0.21, out=gray)
+        np.multiply(frame[:, :, 1], 0.72, out=scratch)
+        gray += scratch
+        np.multiply(frame[:, :, 2], 0.07, out=scratch)
+        gray += scratch
+        np.rint(gray, out=gray)
+
+        if out is None:
+            out = np.empty(dims, dtype=np.uint8)
+
+        np.copyto(out, gray, casting="unsafe")
+
+        return out
+
+    def getObservation(self):
+        """
+        Gets the output of the observation pipeline for the last act(), or
+        for the first screen of the episode after init() or reset_game().
+
+        Returns
+        --------
+        numpy uint8 array
+            Returns the stacked frames with the shape (k, width, height), see
+            :class:`ple.ObservationPipeline`. The array is overwritten by the
+            next act(), copy it if it needs to be kept.
+
+        """
+        if self.observation_pipeline is None:
+            raise ValueError("PLE was not given an observation_pipeline.")
 
-        return frame
+        return self.observation_pipeline.getObservation()
 
     def saveScreen(self, filename):
         """
@@ -356,6 +493,50 @@ class PLE(object):
             raise ValueError(
                 "Was asked to return state vector for game that does not support it!")
 
+    def getGameStateFields(self):
+        """
+        Gets the names of the entries in :func:`getGameStateVector`.
+
+        Returns
+        -------
+
+        tuple of str
+
+        """
+        fields = self.game.getGameStateFields()
+        if fields is None:
+            raise ValueError(
+                "Was asked to return state vector for game that does not support it!")
+
+        return fields
+
+    def getGameStateVector(self, out=None):
+        """
+        Gets the non-visual state of the game as a flat float32 array, without
+        building the dict of :func:`getGameState`. The state_preprocessor is
+        not applied.
+
+        Parameters
+        ----------
+
+        out : numpy float32 array (default: None)
+            If given the state is written into this array, which must have
+            the shape (len(getGameStateFields()),), instead of a new one.
+
+        Returns
+        -------
+
+        numpy float32 array
+            The entries are named by :func:`getGameStateFields`.
+
+        """
+        state = self.game.getGameStateVector(out=out)
+        if state is None:
+            raise ValueError(
+                "Was asked to return state vector for game that does not support it!")
+
+        return state
+
     def act(self, action):
         """
         Perform an action on the game. We lockstep frames with actions. If act is not called the game will not run.
@@ -363,8 +544,9 @@ class PLE(object):
         Parameters
         ----------
 
-        action : int
+        action : int or tuple of int
             The index of the action we wish to perform. The index usually corresponds to the index item returned by getActionSet().
+            A tuple of actions presses them all in the same step, eg. forward and turn in RaycastMaze.
 
         Returns
         -------
@@ -373,7 +555,91 @@ class PLE(object):
             Returns the reward that the agent has accumlated while performing the action.
 
         """
-        return sum(self._oneStepAct(action) for i in range(self.frame_skip))
+        if action not in self._valid_actions and not (
+                isinstance(action, tuple) and
+                all(a in self._valid_actions for a in action)):
+            action = self.NOOP
+
+        pipeline = self.observation_pipeline
+        if pipeline is None:
+            return sum(self._oneStepAct(action) for i in range(self.frame_skip))
+
+        reward = 0.0
+        for i in range(self.frame_skip):
+            reward += self._oneStepAct(action)
+
+            if pipeline.max_pool and i == self.frame_skip - 2:
+                pipeline.hold(self.getScreenRGB(out=pipeline.rgb))
+
+        pipeline.push(self.getScreenRGB(out=pipeline.rgb))
+
+        return reward
+
+    def get_profile(self):
+        """
+        Gets the time spent in each phase since PLE was created or
+        reset_profile() was called. Requires `profile=True`.
+
+        The phases are "act", the whole of act(), and within it "dispatch",
+        handing the action to the game, "step", the game simulation,
+        "render", drawing frames, "display", updating the window, and
+        "reward". "observation" is the time to copy the screen or read the
+        state, rendering excluded, including reads made outside of act().
+
+        Returns
+        -------
+
+        dict
+            Maps each phase to a dict with the total time in nanoseconds,
+            "ns", and the number of times it ran, "calls".
+
+        """
+        if self._profile is None:
+            raise ValueError("PLE was not created with profile=True.")
+
+        return dict((phase, {"ns": ns, "calls": calls})
+                    for phase, (ns, calls) in self._profile.items())
+
+    def reset_profile(self):
+        """
+        Zeroes the timers and counts returned by get_profile().
+        """
+        self._profile = dict((phase, [0, 0]) for phase in PROFILE_PHASES)
+
+    def _record(self, phase, start):
+        timer = self._profile[phase]
+        timer[0] += _clock_ns() - start
+        timer[1] += 1
+
+    def _timed(self, phase, method):
+        def timed(*args, **kwargs):
+            start = _clock_ns()
+            result = method(*args, **kwargs)
+            self._record(phase, start)
+            return result
+
+        return timed
+
+    def _renderFirst(self, method):
+        def rendered(*args, **kwargs):
+            self._render()
+            return method(*args, **kwargs)
+
+        return rendered
+
+    def _render(self):
+        """
+        Draws the game screen if it is behind the game state.
+        """
+        if self._needs_render:
+            self._renderGame()
+            self._needs_render = False
+
+    def _renderGame(self):
+        self.game.render()
+
+    def _stepGame(self, dt):
+        self.game.step(dt)
 
     def _draw_frame(self):
         """
@@ -384,19 +650,23 @@ class PLE(object):
 
     def _oneStepAct(self, action):
         """
-        Performs an action on the game. Checks if the game is over or if the provided action is valid based on the allowed action set.
+        Performs an action on the game. Checks if the game is over. The action must already be valid, see act().
         """
         if self.game_over():
             return 0.0
 
-        if action not in self.getActionSet():
-            action = self.NOOP
-
         self._setAction(action)
         for i in range(self.num_steps):
             time_elapsed = self._tick()
-            self.game.step(time_elapsed)
-            self._draw_frame()
+            self._stepGame(time_elapsed)
+
+            # frames that are skipped are never drawn, the last one is drawn
+            # when the screen is read.
+            if self.display_screen:
+                self._renderGame()
+                self._draw_frame()
+            else:
+                self._needs_render = True
 
         self.frame_count += self.num_steps
 
@@ -404,11 +674,10 @@ class PLE(object):
 
     def _setAction(self, action):
         """
-            Instructs the game to perform an action if its not a NOOP
+            Hands the action straight to the game, a NOOP included.
         """
 
-        if action is not None:
-            self.game._setAction(action, self.last_action)
+        self.game._setAction(action, self.last_action)
 
         self.last_action = action
 
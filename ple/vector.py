@@ -0,0 +1,511 @@
+import os
+import multiprocessing
+import traceback
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    shared_memory = None
+
+from .ple import PLE
+
+
+class VectorPLE(object):
+    """
+    ple.VectorPLE(
+        game_factory, n,
+        observation="rgb", rng=24,
+        **kwargs
+    )
+
+    Steps a batch of N independent game instances with a single call.
+    Each instance is wrapped by its own headless :class:`ple.PLE` and the
+    results are stacked into numpy arrays. Finished games are reset
+    automatically.
+
+    Parameters
+    ----------
+    game_factory: callable
+        Called with no arguments to build each game, eg. ``Catcher`` or
+        ``lambda: Pong(width=128, height=96)``.
+
+    n: int
+        The number of game instances.
+
+    observation: str (default: "rgb")
+        The observation returned for each instance. One of "rgb",
+        "grayscale" or "state". The "state" observation is the games
+        state vector, see :func:`ple.PLE.getGameStateVector`, or the output
+        of the `state_preprocessor` if one is passed through `kwargs`.
+
+    rng: int or numpy.random.RandomState (default: 24)
+        If an int is given the instance at index i is seeded with rng + i.
+        Otherwise a seed is drawn from the RandomState for each instance.
+
+    kwargs:
+        Any other keyword arguments are handed to each :class:`ple.PLE`.
+
+    """
+
+    def __init__(self, game_factory, n, observation="rgb", rng=24, **kwargs):
+        if observation not in ("rgb", "grayscale", "state"):
+            raise ValueError("Unknown observation type: %s" % observation)
+
+        if kwargs.get("display_screen", False):
+            raise ValueError("VectorPLE does not support display_screen.")
+
+        if isinstance(rng, np.random.RandomState):
+            seeds = rng.randint(0, 2**31 - 1, size=n)
+        else:
+            seeds = np.arange(n) + rng
+
+        # headless games each draw to their own surface and event queue
+        # instead of sharing the display's.
+        kwargs["headless"] = True
+
+        self.n = n
+        self.observation = observation
+        self.envs = [PLE(game_factory(), rng=int(seeds[i]), **kwargs)
+                     for i in range(n)]
+
+        self._action_set = self.envs[0].getActionSet()
+        self._obs = np.empty(
+            (n,) + _observation_shape(self.envs[0], observation),
+            dtype=np.float32 if observation == "state" else np.uint8)
+
+    def getActionSet(self):
+        """
+        Gets the actions shared by every instance. The indices of this
+        list are what :func:`step` expects.
+
+        Returns
+        --------
+
+        list of pygame.constants
+
+        """
+        return list(self._action_set)
+
+    def getScreenDims(self):
+        """
+        Gets the screen dimensions of a single instance.
+
+        Returns
+        -------
+
+        tuple of int
+            Returns a tuple of the following format (screen_width, screen_height).
+        """
+        return self.envs[0].getScreenDims()
+
+    def getGameStateFields(self):
+        """
+        Gets the names of the columns of the "state" observation when no
+        state_preprocessor is used.
+
+        Returns
+        -------
+
+        tuple of str
+
+        """
+        return self.envs[0].getGameStateFields()
+
+    def reset(self):
+        """
+        Resets every instance to a clean initial state.
+
+        Returns
+        -------
+
+        numpy array
+            The stacked observations with shape (n, ...). The array is
+            reused by later calls, copy it if it needs to be kept.
+
+        """
+        for i, env in enumerate(self.envs):
+            env.reset_game()
+            _observe(env, self.observation, self._obs[i])
+
+        return self._obs
+
+    def step(self, actions):
+        """
+        Performs one action on every instance.
+
+        Parameters
+        ----------
+
+        actions : array_like of int
+            Shape (n,). Each entry is an index into :func:`getActionSet`.
+
+        Returns
+        -------
+
+        tuple of numpy arrays
+            The stacked observations with shape (n, ...), the rewards with
+            shape (n,) and the done flags with shape (n,). An instance that
+            reached a terminal state is reset and its observation is the
+            first one of the new episode. The observation array is reused
+            by later calls, copy it if it needs to be kept.
+
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.n,):
+            raise ValueError("Expected actions of shape (%d,), got %s." %
+                             (self.n, actions.shape))
+
+        rewards = np.empty(self.n, dtype=np.float32)
+        dones = np.empty(self.n, dtype=bool)
+        action_set = self._action_set
+
+        for i, env in enumerate(self.envs):
+            rewards[i] = env.act(action_set[actions[i]])
+            dones[i] = env.game_over()
+
+            if dones[i]:
+                env.reset_game()
+
+            _observe(env, self.observation, self._obs[i])
+
+        return self._obs, rewards, dones
+
+
+def _observation_shape(env, observation):
+    if observation == "rgb":
+        return tuple(env.getScreenDims()) + (3,)
+    if observation == "grayscale":
+        return tuple(env.getScreenDims())
+
+    if env.state_preprocessor is not None:
+        return tuple(env.getGameStateDims())
+
+    return (len(env.getGameStateFields()),)
+
+
+def _observe(env, observation, out):
+    if observation == "rgb":
+        env.getScreenRGB(out=out)
+    elif observation == "grayscale":
+        env.getScreenGrayscale(out=out)
+    elif env.state_preprocessor is None:
+        env.getGameStateVector(out=out)
+    else:
+        out[...] = env.getGameState()
+
+
+def _worker(remote, parent_remote, game_factory, seed, observation, kwargs):
+    """
+    Owns one PLE instance inside a subprocess and writes its observations
+    into the shared memory block named by the parent.
+    """
+    parent_remote.close()
+
+    try:
+        env = PLE(game_factory(), rng=seed, **kwargs)
+        remote.send((_observation_shape(env, observation),
+                     env.getScreenDims(), env.getActionSet(),
+                     env.game.getGameStateFields()))
+    except Exception:
+        # the parent raises it, the traceback may not pickle.
+        remote.send(traceback.format_exc())
+        remote.close()
+        return
+
+    cmd, data = remote.recv()
+    if cmd == "close":
+        remote.close()
+        return
+
+    name, shape, dtype, index = data
+    shm = shared_memory.SharedMemory(name=name)
+    buf = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    action_set = env.getActionSet()
+
+    try:
+        while True:
+            cmd, data = remote.recv()
+
+            if cmd == "step":
+                action, slot = data
+                reward = env.act(action_set[action])
+                done = env.game_over()
+                if done:
+                    env.reset_game()
+
+                _observe(env, observation, buf[slot, index])
+                remote.send((reward, done))
+
+            elif cmd == "reset":
+                env.reset_game()
+                _observe(env, observation, buf[data, index])
+                remote.send(None)
+
+            elif cmd == "close":
+                break
+    finally:
+        del buf
+        shm.close()
+        remote.close()
+
+
+class SubprocVectorPLE(object):
+    """
+    ple.SubprocVectorPLE(
+        game_factory, n,
+        observation="rgb", rng=24,
+        ring_size=2, start_method=None,
+        **kwargs
+    )
+
+    Same interface as :class:`VectorPLE`, plus :func:`close`, but each game
+    runs in its own process, which sidesteps pygame's global display state
+    and spreads the work across cores. Workers write observations straight
+    into a shared memory ring that is read without pickling.
+
+    The workers and the shared memory are freed by :func:`close`, or on
+    leaving a with block:
+
+    >>> with SubprocVectorPLE(Catcher, 8) as env:
+    >>>     obs = env.reset()
+
+    Parameters
+    ----------
+    game_factory: callable
+        Called with no arguments inside each worker to build its game. It
+        must be picklable if the start method is not "fork".
+
+    n: int
+        The number of game instances and worker processes.
+
+    observation: str (default: "rgb")
+        One of "rgb", "grayscale" or "state", see :class:`VectorPLE`.
+
+    rng: int or numpy.random.RandomState (default: 24)
+        Seeds the instances, see :class:`VectorPLE`.
+
+    ring_size: int (default: 2)
+        The number of observation slots in the shared ring. The array
+        returned by :func:`step` stays valid for ring_size - 1 further calls.
+
+    start_method: str or None (default: None)
+        The multiprocessing start method, None uses the platform default.
+
+    kwargs:
+        Any other keyword arguments are handed to each :class:`ple.PLE`.
+
+    """
+
+    def __init__(self, game_factory, n, observation="rgb", rng=24,
+                 ring_size=2, start_method=None, **kwargs):
+        self._closed = True  # nothing to free until the workers start.
+
+        if shared_memory is None:
+            raise ImportError(
+                "SubprocVectorPLE requires multiprocessing.shared_memory (python 3.8+).")
+
+        if observation not in ("rgb", "grayscale", "state"):
+            raise ValueError("Unknown observation type: %s" % observation)
+
+        if kwargs.get("display_screen", False):
+            raise ValueError("SubprocVectorPLE does not support display_screen.")
+
+        if ring_size < 1:
+            raise ValueError("ring_size must be at least 1.")
+
+        kwargs.setdefault("headless", True)
+
+        if isinstance(rng, np.random.RandomState):
+            seeds = rng.randint(0, 2**31 - 1, size=n)
+        else:
+            seeds = np.arange(n) + rng
+
+        self.n = n
+        self.observation = observation
+        self.ring_size = ring_size
+        self._slot = 0
+        self.remotes = []
+        self.processes = []
+        self._shm = None
+        self._closed = False
+
+        # whatever was started is stopped and freed if the setup fails.
+        try:
+            self._start(game_factory, seeds, kwargs, start_method)
+        except BaseException:
+            self.close()
+            raise
+
+    def _start(self, game_factory, seeds, kwargs, start_method):
+        # workers attach to the shared block. Start the tracker first so they
+        # share it with us instead of each unlinking the block on exit.
+        if os.name == "posix":
+            resource_tracker.ensure_running()
+
+        ctx = multiprocessing.get_context(start_method)
+        for i in range(self.n):
+            remote, work_remote = ctx.Pipe()
+            self.remotes.append(remote)
+            p = ctx.Process(
+                target=_worker,
+                args=(work_remote, remote, game_factory,
+                      int(seeds[i]), self.observation, kwargs))
+            p.daemon = True
+            p.start()
+            work_remote.close()
+            self.processes.append(p)
+
+        infos = [remote.recv() for remote in self.remotes]
+        for info in infos:
+            if not isinstance(info, tuple):
+                raise RuntimeError("A worker failed to start:\n%s" % info)
+
+        (obs_shape, self._screen_dims, self._action_set,
+         self._state_fields) = infos[0]
+
+        dtype = np.float32 if self.observation == "state" else np.uint8
+        shape = (self.ring_size, self.n) + tuple(obs_shape)
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._buf = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+
+        for i, remote in enumerate(self.remotes):
+            remote.send(("attach", (self._shm.name, shape, dtype, i)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def getActionSet(self):
+        """
+        Gets the actions shared by every instance. The indices of this
+        list are what :func:`step` expects.
+
+        Returns
+        --------
+
+        list of pygame.constants
+
+        """
+        return list(self._action_set)
+
+    def getScreenDims(self):
+        """
+        Gets the screen dimensions of a single instance.
+
+        Returns
+        -------
+
+        tuple of int
+            Returns a tuple of the following format (screen_width, screen_height).
+        """
+        return self._screen_dims
+
+    def getGameStateFields(self):
+        """
+        Gets the names of the columns of the "state" observation when no
+        state_preprocessor is used.
+
+        Returns
+        -------
+
+        tuple of str
+
+        """
+        if self._state_fields is None:
+            raise ValueError(
+                "Was asked to return state vector for game that does not support it!")
+
+        return tuple(self._state_fields)
+
+    def _next_slot(self):
+        slot = self._slot
+        self._slot = (self._slot + 1) % self.ring_size
+        return slot
+
+    def reset(self):
+        """
+        Resets every instance to a clean initial state.
+
+        Returns
+        -------
+
+        numpy array
+            The stacked observations with shape (n, ...), a view into the
+            shared ring.
+
+        """
+        slot = self._next_slot()
+        for remote in self.remotes:
+            remote.send(("reset", slot))
+        for remote in self.remotes:
+            remote.recv()
+
+        return self._buf[slot]
+
+    def step(self, actions):
+        """
+        Performs one action on every instance, in parallel.
+
+        Parameters
+        ----------
+
+        actions : array_like of int
+            Shape (n,). Each entry is an index into :func:`getActionSet`.
+
+        Returns
+        -------
+
+        tuple of numpy arrays
+            The stacked observations with shape (n, ...), the rewards with
+            shape (n,) and the done flags with shape (n,). The observations
+            are a view into the shared ring, see `ring_size`.
+
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.n,):
+            raise ValueError("Expected actions of shape (%d,), got %s." %
+                             (self.n, actions.shape))
+
+        slot = self._next_slot()
+        for remote, action in zip(self.remotes, actions):
+            remote.send(("step", (int(action), slot)))
+
+        rewards = np.empty(self.n, dtype=np.float32)
+        dones = np.empty(self.n, dtype=bool)
+        for i, remote in enumerate(self.remotes):
+            rewards[i], dones[i] = remote.recv()
+
+        return self._buf[slot], rewards, dones
+
+    def close(self):
+        """
+        Stops the worker processes and frees the shared memory. Calling it
+        again does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+            except (EOFError, OSError):
+                pass  # the worker has already exited.
+        for p in self.processes:
+            p.join()
+        for remote in self.remotes:
+            remote.close()
+
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -10,6 +10,7 @@ explicitly check that it isn't defined.
 """
 
 
+import os
 import nose
 import numpy as np
 import unittest
@@ -80,6 +81,243 @@ class MyTestCase(unittest.TestCase):
         game = Pong()
         self.run_a_game(game)
 
+    def test_headless(self):
+        import pygame
+        from ple import PLE
+        from ple.games.flappybird import FlappyBird
+        p = PLE(FlappyBird(), headless=True)
+        for i in range(NUM_STEPS):
+            p.act(p.getActionSet()[i % 2])
+        self.assertEqual(p.getScreenRGB().shape, (288, 512, 3))
+        self.assertIsNot(p.game.screen, pygame.display.get_surface())
+
+    def test_headless_image_format(self):
+        import pygame
+        from ple import PLE
+        from ple.games.flappybird import FlappyBird
+        from ple.games.utils import convert_offscreen
+        game = FlappyBird()
+        PLE(game, headless=True)
+        screen = game.screen
+        image = pygame.image.load(os.path.join(
+            game._dir_, "assets/redbird-upflap.png"))
+        for alpha in [False, True]:
+            converted = convert_offscreen(image, alpha=alpha)
+            self.assertEqual(converted.get_bitsize(), screen.get_bitsize())
+            self.assertEqual(converted.get_masks()[:3], screen.get_masks()[:3])
+            self.assertEqual(bool(converted.get_flags() & pygame.SRCALPHA), alpha)
+            self.assertTrue((pygame.surfarray.array3d(converted) ==
+                             pygame.surfarray.array3d(image)).all())
+
+    def test_screen_out_buffer(self):
+        from ple import PLE
+        from ple.games.pong import Pong
+        p = PLE(Pong(), headless=True)
+        p.act(p.NOOP)
+        rgb = np.zeros((64, 48, 3), dtype=np.uint8)
+        gray = np.zeros((64, 48), dtype=np.uint8)
+        self.assertIs(p.getScreenRGB(out=rgb), rgb)
+        self.assertIs(p.getScreenGrayscale(out=gray), gray)
+        self.assertTrue((rgb == p.getScreenRGB()).all())
+        self.assertTrue((gray == p.getScreenGrayscale()).all())
+        self.assertTrue(rgb.any())
+
+    def test_observation_pipeline(self):
+        from ple import PLE, ObservationPipeline
+        from ple.games.pong import Pong
+        pipeline = ObservationPipeline(dims=(32, 24), frame_stack=4)
+        p = PLE(Pong(), frame_skip=2, headless=True,
+                observation_pipeline=pipeline)
+        p.init()
+        for i in range(6):
+            p.act(p.NOOP)
+        obs = p.getObservation()
+        self.assertEqual(obs.shape, (4, 32, 24))
+        self.assertEqual(obs.dtype, np.uint8)
+        p.reset_game()
+        first = ObservationPipeline(dims=(32, 24), frame_stack=4)
+        first.push(p.getScreenRGB())
+        obs = p.getObservation()
+        self.assertTrue((obs == first.getObservation()).all())
+        self.assertTrue((obs == obs[-1]).all())
+
+    def test_render_on_demand(self):
+        from ple import PLE
+        from ple.games.catcher import Catcher
+        game = Catcher()
+        renders = []
+        render = game.render
+        game.render = lambda: renders.append(render())
+        p = PLE(game, frame_skip=4, headless=True)
+        for i in range(5):
+            p.act(p.NOOP)
+        self.assertEqual(len(renders), 0)
+        p.getScreenRGB()
+        p.getScreenGrayscale()
+        self.assertEqual(len(renders), 1)
+
+    def test_state_vector(self):
+        from ple import PLE
+        from ple.games import Catcher, FlappyBird, Pixelcopter, Pong, PuckWorld
+        for game in [Catcher(), FlappyBird(), Pixelcopter(), Pong(), PuckWorld()]:
+            p = PLE(game, fps=30, headless=True)
+            for i in range(10):
+                p.act(p.NOOP)
+            state = p.getGameState()
+            vector = p.getGameStateVector()
+            self.assertEqual(vector.dtype, np.float32)
+            expected = [state[f] for f in p.getGameStateFields()]
+            self.assertTrue(np.allclose(vector, expected))
+            self.assertIs(p.getGameStateVector(out=vector), vector)
+
+    def test_direct_actions(self):
+        import pygame
+        from ple import PLE
+        from ple.games.catcher import Catcher
+        p = PLE(Catcher(), fps=30)
+        x = p.getGameState()["player_x"]
+        pygame.event.clear()
+        for i in range(5):
+            p.act(Catcher().actions["left"])
+        self.assertLess(p.getGameState()["player_x"], x)
+        self.assertEqual(pygame.event.get(pygame.KEYDOWN), [])
+
+    def test_benchmark(self):
+        from ple import benchmark
+        results = benchmark.run(games=["Catcher"], steps=10, resets=2)
+        catcher = results["games"]["Catcher"]
+        self.assertGreater(catcher["step_per_sec"], 0)
+        self.assertEqual(set(catcher["observation_sec"]),
+                         set(["rgb", "grayscale", "state"]))
+        self.assertGreater(catcher["act_observe_per_sec"], 0)
+
+    def test_benchmark_games(self):
+        import ple.games
+        from ple import benchmark
+        self.assertIn("Catcher", benchmark.GAMES)
+        for name in benchmark.GAMES:
+            self.assertTrue(hasattr(ple.games, name))
+        self.assertEqual(hasattr(ple.games, "Doom"), "Doom" in benchmark.GAMES)
+
+    def test_benchmark_json(self):
+        import json
+        import sys
+        from ple import benchmark
+        try:
+            from StringIO import StringIO
+        except ImportError:  # python 3
+            from io import StringIO
+
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            benchmark.main(["--games", "Catcher", "--steps", "5", "--resets", "1"])
+            text = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        results = json.loads(text)
+        self.assertIn("Catcher", results["games"])
+
+    def test_profile(self):
+        from ple import PLE
+        from ple.games.catcher import Catcher
+        p = PLE(Catcher(), frame_skip=4, headless=True, profile=True)
+        for i in range(10):
+            p.act(p.NOOP)
+        p.getScreenRGB()
+        profile = p.get_profile()
+        self.assertEqual(profile["act"]["calls"], 10)
+        self.assertEqual(profile["step"]["calls"], 40)
+        self.assertEqual(profile["render"]["calls"], 1)
+        self.assertEqual(profile["observation"]["calls"], 1)
+        self.assertGreater(profile["step"]["ns"], 0)
+        p.reset_profile()
+        self.assertEqual(p.get_profile()["act"]["calls"], 0)
+
+    def test_asset_cache(self):
+        from ple import PLE
+        from ple.games.monsterkong import MonsterKong
+        from ple.games.utils.assets import load_image
+        games = [MonsterKong(), MonsterKong()]
+        for game in games:
+            PLE(game, fps=30, headless=True).init()
+
+        self.assertTrue(games[0].IMAGES["still"] is games[1].IMAGES["still"])
+        walls = games[0].newGame.Walls
+        self.assertTrue(walls[0].image is walls[1].image)
+        self.assertEqual(walls[0].image.get_size(), (15, 15))
+
+        path = os.path.join(games[0]._dir, "assets/coin1.png")
+        self.assertTrue(load_image(path, (15, 15), alpha=True) is
+                        load_image(path, [15, 15], alpha=True))
+        self.assertFalse(load_image(path, (15, 15)) is load_image(path))
+
+        # cached in the format of the headless screen.
+        image = games[0].IMAGES["still"]
+        screen = games[0].screen
+        self.assertEqual(image.get_bitsize(), screen.get_bitsize())
+        self.assertEqual(image.get_masks()[:3], screen.get_masks()[:3])
+
+    def test_monsterkong_draw_point(self):
+        from ple import PLE
+        from ple.games.monsterkong import MonsterKong
+        game = MonsterKong()
+        p = PLE(game, fps=30, headless=True, rng=3)
+        p.act(p.NOOP)
+        frame = p.getScreenRGB()
+
+        # the frame shows the monsters before their update in the step.
+        game.newGame.Enemies[0].rect.move_ip(30, 0)
+        game.render()
+        self.assertTrue((p.getScreenRGB() == frame).all())
+        game.newGame.captureScreen()
+        game.render()
+        self.assertFalse((p.getScreenRGB() == frame).all())
+
+    def test_tile_grid(self):
+        import pygame
+        from ple import PLE
+        from ple.games.monsterkong import MonsterKong
+        from ple.games.monsterkong.tileGrid import spritecollide
+        game = MonsterKong()
+        PLE(game, fps=30, headless=True, rng=3).init()
+        board = game.newGame
+
+        rng = np.random.RandomState(0)
+        probe = pygame.sprite.Sprite()
+        for i in range(500):
+            probe.rect = pygame.Rect(rng.randint(-20, 500), rng.randint(-20, 465),
+                                     rng.randint(1, 50), rng.randint(1, 50))
+            for grid, group in [(board.wallGrid, board.wallGroup),
+                                (board.ladderGrid, board.ladderGroup)]:
+                self.assertEqual(spritecollide(probe, grid),
+                                 pygame.sprite.spritecollide(probe, group, False))
+
+    def test_level_seeds(self):
+        from ple import PLE
+        from ple.games.monsterkong import MonsterKong
+        maps = []
+        for rng in [1, 2]:
+            game = MonsterKong(levelSeeds=[7])
+            env = PLE(game, fps=30, headless=True, rng=rng)
+            env.init()
+            maps.append(game.newGame.map.copy())
+            env.reset_game()
+            maps.append(game.newGame.map.copy())
+
+        for levelMap in maps[1:]:
+            self.assertTrue(np.array_equal(levelMap, maps[0]))
+        self.assertTrue(16 <= (maps[0] == 3).sum() <= 26)
+
+        # the cache keeps only the most recently used levels.
+        from ple.games.monsterkong import board
+        game = MonsterKong(levelSeeds=range(board._maxLevels + 10))
+        env = PLE(game, fps=30, headless=True, rng=3)
+        for i in range(300):
+            env.reset_game()
+        self.assertLessEqual(len(board._levels), board._maxLevels)
+
     def test_doom_not_defined(self):
         from nose.tools import assert_raises
         def invoke_doom():
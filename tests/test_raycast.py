@@ -0,0 +1,318 @@
+#!/usr/bin/python
+
+
+"""
+
+This tests the raycasting engine used by RaycastMaze.
+
+
+"""
+
+
+import nose
+import numpy as np
+import unittest
+
+
+def make_mazes(sizes, seed=24):
+    from ple.games.raycastmaze import RaycastMaze
+    games = []
+    for i, size in enumerate(sizes):
+        game = RaycastMaze(map_size=size, width=64, height=48)
+        game.rng = np.random.RandomState(seed + i)
+        game.init()
+        games.append(game)
+
+    return games
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_batched_cast_matches_single(self):
+        from ple.games.raycast import cast_rays, stack_maps
+        games = make_mazes([6, 8, 10, 12])
+        for i, game in enumerate(games):
+            angle = 0.7 * i
+            game.dir[0] = (np.cos(angle), np.sin(angle))
+            game.plane[0] = (-0.66 * np.sin(angle), 0.66 * np.cos(angle))
+
+        pos = np.concatenate([g.pos for g in games])
+        dir_ = np.concatenate([g.dir for g in games])
+        plane = np.concatenate([g.plane for g in games])
+        maps = stack_maps([g.map_ for g in games])
+
+        columns, tops, bottoms, colors = cast_rays(
+            pos, dir_, plane, maps, 64, 48, 1, games[0].shade_table)
+
+        self.assertEqual(tops.shape, (4, 64))
+        self.assertEqual(colors.shape, (4, 64, 3))
+        for i, game in enumerate(games):
+            c, t, b, col = game.draw()
+            self.assertTrue((columns == c).all())
+            self.assertTrue((tops[i] == t).all())
+            self.assertTrue((bottoms[i] == b).all())
+            self.assertTrue((colors[i] == col).all())
+
+
+    def test_rasterize_matches_pygame_lines(self):
+        import pygame
+        from ple.games.raycast import make_background, rasterize
+        for resolution in [1, 3]:
+            game = make_mazes([8])[0]
+            game.resolution = resolution
+            frame = np.zeros((64, 48, 3), dtype=np.uint8)
+            columns, tops, bottoms, colors = game.draw()
+            rasterize(columns, tops, bottoms, colors, resolution,
+                      make_background(64, 48), frame)
+
+            screen = pygame.Surface((64, 48))
+            pygame.draw.rect(screen, (92, 92, 92), (0, 24, 64, 48))
+            for i in range(len(columns)):
+                pygame.draw.line(screen, tuple(colors[i]),
+                                 (columns[i], tops[i]),
+                                 (columns[i], bottoms[i]), resolution)
+
+            self.assertTrue((pygame.surfarray.array3d(screen) == frame).all())
+
+    def test_wall_distances(self):
+        from collections import deque
+        from ple.games.raycastmaze import make_maze, wall_distances
+        for size in [7, 10, 21]:
+            map_ = make_maze(np.random.RandomState(size), size)
+            self.assertEqual(map_.shape, (size // 2 * 2 + 1,) * 2)
+
+            # plain breadth first search for the reference distances.
+            dist = {(1, 1): 0}
+            queue = deque([(1, 1)])
+            walls = {}
+            while queue:
+                y, x = queue.popleft()
+                for n in [(y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)]:
+                    if map_[n] != 0:
+                        walls[n] = min(walls.get(n, dist[y, x] + 1), dist[y, x] + 1)
+                    elif n not in dist:
+                        dist[n] = dist[y, x] + 1
+                        queue.append(n)
+
+            found = wall_distances(map_, (1, 1))
+            for (y, x), d in walls.items():
+                self.assertEqual(found[y, x], d)
+            self.assertEqual((found >= 0).sum(), len(walls))
+
+        # odd sizes used to index past the maze.
+        make_mazes([7, 9])
+
+    def test_seeded_targets(self):
+        from ple.games.raycastmaze import RaycastMaze
+        # the targets of earlier releases for these seeds.
+        expected = {(10, None): [3, 6], (14, None): [13, 0],
+                    (20, None): [1, 12], (10, 5): [5, 2]}
+        for (size, dist), target in expected.items():
+            game = RaycastMaze(map_size=size, init_pos_distance_to_target=dist)
+            game.rng = np.random.RandomState(7)
+            game.init()
+            self.assertEqual(game.obj_loc.tolist(), [target])
+
+    def test_maze_pool(self):
+        from ple.games.raycastmaze import RaycastMaze, MazePool
+        layouts = []
+        for i in range(2):
+            pool = MazePool(size=4, seed=3)
+            game = RaycastMaze(map_size=8, init_pos_distance_to_target=3,
+                               maze_pool=pool)
+            game.rng = np.random.RandomState(24)
+
+            maps = []
+            for j in range(6):
+                game.init()
+                self.assertEqual((game.map_ == 2).sum(), 1)
+                self.assertEqual(game.map_[tuple(game.obj_loc[0])], 2)
+                maps.append(game.map_.copy())
+
+            pool.close()
+            layouts.append(maps)
+
+        for a, b in zip(*layouts):
+            self.assertTrue((a == b).all())
+
+        # a failing thread hands its error to every get.
+        pool = MazePool(size=4, seed=3)
+        for i in range(2):
+            self.assertRaises(ValueError, pool.get, 8, 0)
+        pool.close()
+
+    def test_observation_dims(self):
+        from ple import PLE
+        from ple.games.raycastmaze import RaycastMaze
+        small = RaycastMaze(width=32, height=24)
+        game = RaycastMaze(width=128, height=96, resolution=4,
+                           observation_dims=(32, 24))
+
+        frames = []
+        for g in [small, game]:
+            env = PLE(g, headless=True, rng=24)
+            env.init()
+            env.act(env.NOOP)
+            self.assertEqual(env.getScreenDims(), (32, 24))
+            frames.append(env.getScreenRGB())
+
+        self.assertEqual(game.screen.get_size(), (128, 96))
+        self.assertTrue((frames[0] == frames[1]).all())
+
+    def test_state(self):
+        game = make_mazes([10])[0]
+        game.pos[0] = (1.5, 1.5)
+
+        state = game.getGameState()
+        vector = game.getGameStateVector()
+        fields = game.getGameStateFields()
+        self.assertEqual(vector.shape, (len(fields),))
+        self.assertEqual(vector.dtype, np.float32)
+
+        for i, name in enumerate(fields[:5]):
+            self.assertAlmostEqual(vector[i], state[name], places=5)
+
+        rays = vector[5:5 + game.state_rays]
+        self.assertTrue(np.allclose(rays, state["ray_distances"]))
+        self.assertTrue((rays > 0).all())
+        self.assertTrue((vector[5 + game.state_rays:] ==
+                         state["occupancy"].ravel()).all())
+
+        # the player stands in the middle of the patch.
+        occupancy = state["occupancy"]
+        self.assertEqual(occupancy.shape, (5, 5))
+        self.assertEqual(occupancy[2, 2], game.map_[1, 1])
+
+    def test_combined_and_continuous_actions(self):
+        from ple import PLE
+        from ple.games.raycastmaze import RaycastMaze
+        envs = []
+        for i in range(3):
+            env = PLE(RaycastMaze(), headless=True, fps=30, rng=24)
+            env.init()
+            env.game.map_[1:-1, 1:-1] = 0
+            env.game.pos[0] = (1.5, 1.5)
+            env.game.dir[0] = (1.0, 0.0)
+            env.game.plane[0] = (0.0, 0.66)
+            envs.append(env)
+
+        forward = envs[0].game.actions["forward"]
+        right = envs[0].game.actions["right"]
+
+        envs[0].act(forward)
+        envs[0].act(right)
+        envs[1].act((forward, right))
+        envs[2].game.setMovement(1.0, 1.0)
+        envs[2].act(envs[2].NOOP)
+
+        self.assertTrue(envs[0].game.pos[0, 0] > 1.5)
+        for env in envs[1:]:
+            self.assertTrue((env.game.pos == envs[0].game.pos).all())
+            self.assertTrue((env.game.dir == envs[0].game.dir).all())
+            self.assertTrue((env.game.plane == envs[0].game.plane).all())
+
+        # a movement lasts for the skipped frames and the next acts too.
+        envs = []
+        for i in range(2):
+            env = PLE(RaycastMaze(), headless=True, fps=30, rng=24,
+                      frame_skip=2)
+            env.init()
+            env.game.map_[1:-1, 1:-1] = 0
+            env.game.pos[0] = (1.5, 1.5)
+            env.game.dir[0] = (1.0, 0.0)
+            env.game.plane[0] = (0.0, 0.66)
+            envs.append(env)
+
+        envs[0].act((forward, right))
+        envs[0].act((forward, right))
+        envs[1].game.setMovement(1.0, 1.0)
+        envs[1].act(envs[1].NOOP)
+        envs[1].act(envs[1].NOOP)
+        self.assertTrue((envs[1].game.pos == envs[0].game.pos).all())
+        self.assertTrue((envs[1].game.dir == envs[0].game.dir).all())
+
+        # a key action ends it.
+        envs[1].act(right)
+        envs[1].act(envs[1].NOOP)
+        envs[0].act(right)
+        self.assertTrue((envs[1].game.pos == envs[0].game.pos).all())
+        self.assertTrue((envs[1].game.dir == envs[0].game.dir).all())
+
+    def test_arena(self):
+        from ple import PLE
+        from ple.games.raycastarena import RaycastArena
+        from ple.games.raycast import cast_rays, rasterize
+        game = RaycastArena(num_agents=3, width=32, height=24)
+        env = PLE(game, headless=True, fps=30, rng=24)
+        env.init()
+
+        start = game.pos.copy()
+        game.setActions([None, game.actions["left"], game.actions["right"]])
+        env.act(env.NOOP)
+
+        self.assertTrue((game.pos == start).all())
+        self.assertTrue((game.dir[0] != game.dir[1]).any())
+        self.assertTrue((game.dir[1] != game.dir[2]).any())
+        self.assertEqual(game.getScores().shape, (3,))
+
+        frames = game.getScreensRGB()
+        self.assertEqual(frames.shape, (3, 32, 24, 3))
+        self.assertTrue((env.getScreenRGB() == frames[0]).all())
+
+        # the batched views match casting each agent on its own.
+        frame = np.zeros((32, 24, 3), dtype=np.uint8)
+        for i in range(3):
+            c, t, b, col = cast_rays(
+                game.pos[i:i + 1], game.dir[i:i + 1], game.plane[i:i + 1],
+                game.map_[np.newaxis], 32, 24, 1, game.shade_table)
+            rasterize(c, t[0], b[0], col[0], 1, game._background, frame)
+            self.assertTrue((frames[i] == frame).all())
+
+    def test_arena_actions_and_rewards(self):
+        from ple import PLE
+        from ple.games.raycastarena import RaycastArena
+        games = []
+        for frame_skip in [1, 2]:
+            game = RaycastArena(num_agents=2, width=32, height=24)
+            env = PLE(game, headless=True, fps=30, rng=24,
+                      frame_skip=frame_skip)
+            env.init()
+            game.map_[1:-1, 1:-1] = 0
+            game.obj_loc = np.array([[6, 6]])
+            game.map_[6, 6] = 2
+            game.pos[:] = [(1.5, 1.5), (1.5, 3.5)]
+            game.dir[:] = (1.0, 0.0)
+            game.plane[:] = (0.0, 0.66)
+            games.append((env, game))
+
+        # the actions last for the skipped frames and the next acts.
+        forward = game.actions["forward"]
+        for env, game in games:
+            game.setActions([forward, (forward, game.actions["left"])])
+        for i in range(2):
+            games[0][0].act(games[0][0].NOOP)
+        games[1][0].act(games[1][0].NOOP)
+        self.assertTrue(games[0][1].pos[0, 0] > 1.5)
+        self.assertTrue((games[0][1].pos == games[1][1].pos).all())
+        self.assertTrue((games[0][1].dir == games[1][1].dir).all())
+
+        # agent 1 reaches the target, agent 0 loses.
+        env, game = games[0]
+        game.pos[1] = (6.0, 6.5)
+        game.dir[1] = (1.0, 0.0)
+        game.setActions([None, None])
+        env.act(env.NOOP)
+        self.assertTrue(env.game_over())
+        tick = game.rewards["tick"]
+        self.assertTrue(np.allclose(
+            game.getRewards(),
+            [game.rewards["loss"] + tick, game.rewards["win"] + tick]))
+
+    def test_arena_too_many_agents(self):
+        from ple import PLE
+        from ple.games.raycastarena import RaycastArena
+        self.assertRaises(ValueError, PLE, RaycastArena(num_agents=50, map_size=6),
+                          headless=True, fps=30)
+
+if __name__ == "__main__":
+    nose.runmodule()
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+
+
+"""
+
+This tests that VectorPLE steps a batch of games and resets them.
+
+
+"""
+
+
+import nose
+import numpy as np
+import unittest
+
+NUM_ENVS=4
+NUM_STEPS=150
+
+
+def broken_game():
+    raise IOError("missing assets")
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_vector_rgb(self):
+        from ple import VectorPLE
+        from ple.games.catcher import Catcher
+        env = VectorPLE(lambda: Catcher(init_lives=1), NUM_ENVS)
+        obs = env.reset()
+        self.assertEqual(obs.shape, (NUM_ENVS, 64, 64, 3))
+        self.assertEqual(obs.dtype, np.uint8)
+
+        num_actions = len(env.getActionSet())
+        done_seen = False
+        for i in range(NUM_STEPS):
+            actions = np.random.randint(0, num_actions, size=NUM_ENVS)
+            obs, rewards, dones = env.step(actions)
+            self.assertEqual(rewards.shape, (NUM_ENVS,))
+            self.assertEqual(dones.shape, (NUM_ENVS,))
+            done_seen = done_seen or dones.any()
+
+        self.assertTrue(done_seen)
+        for e in env.envs:
+            self.assertFalse(e.game_over())
+
+    def test_vector_separate_screens(self):
+        from ple import VectorPLE
+        from ple.games.pong import Pong
+        env = VectorPLE(Pong, 2, observation="grayscale")
+        obs = env.reset()
+        self.assertEqual(obs.shape, (2, 64, 48))
+        screens = [e.game.screen for e in env.envs]
+        self.assertIsNot(screens[0], screens[1])
+
+    def test_vector_state(self):
+        from ple import VectorPLE
+        from ple.games.pong import Pong
+        preprocessor = lambda s: np.array(list(s.values()))
+        env = VectorPLE(Pong, 3, observation="state",
+                        state_preprocessor=preprocessor)
+        obs, rewards, dones = env.step(np.zeros(3, dtype=int))
+        self.assertEqual(obs.shape, (3, 7))
+
+    def test_vector_state_vector(self):
+        from ple import VectorPLE
+        from ple.games.waterworld import WaterWorld
+        env = VectorPLE(lambda: WaterWorld(num_creeps=5), 2,
+                        observation="state")
+        obs = env.reset()
+        self.assertEqual(obs.shape, (2, 4 + 5 * 4))
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertEqual(len(env.getGameStateFields()), obs.shape[1])
+        for i, e in enumerate(env.envs):
+            self.assertTrue((obs[i] == e.getGameStateVector()).all())
+
+    def test_subproc_vector(self):
+        from ple import SubprocVectorPLE
+        from ple.games.catcher import Catcher
+        env = SubprocVectorPLE(Catcher, 2, observation="grayscale")
+        try:
+            first = env.reset().copy()
+            self.assertEqual(first.shape, (2, 64, 64))
+            for i in range(20):
+                obs, rewards, dones = env.step(np.ones(2, dtype=int))
+            self.assertEqual(obs.shape, (2, 64, 64))
+            self.assertEqual(rewards.shape, (2,))
+            self.assertTrue((obs != first).any())
+        finally:
+            env.close()
+
+    def test_subproc_vector_with(self):
+        from ple import SubprocVectorPLE
+        from ple.games.pong import Pong
+        with SubprocVectorPLE(Pong, 2, observation="state") as env:
+            obs = env.reset()
+            self.assertEqual(len(env.getGameStateFields()), obs.shape[1])
+            processes = env.processes
+        self.assertTrue(env._closed)
+        for p in processes:
+            self.assertFalse(p.is_alive())
+        env.close()
+
+    def test_subproc_vector_failed_start(self):
+        from ple import SubprocVectorPLE
+        env = SubprocVectorPLE.__new__(SubprocVectorPLE)
+        self.assertRaises(RuntimeError, env.__init__, broken_game, 2)
+        self.assertTrue(env._closed)
+        self.assertIsNone(env._shm)
+        for p in env.processes:
+            self.assertFalse(p.is_alive())
+
+
+if __name__ == "__main__":
+    nose.runmodule()